@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import uuid
+from budget_export import run_export, write_budget_xlsx
+
+# Where budget records and rendered workbooks live
+BUDGET_DIR = os.getenv("BUDGET_DIR", "budgets")
+
+# Upper bound on disk used by rendered workbooks; least recently downloaded ones are removed first
+BUDGET_RENDER_CACHE_BYTES = int(os.getenv("BUDGET_RENDER_CACHE_BYTES", str(256 * 1024 * 1024)))
+
+# Lifecycle policy enforced by the background sweeper
+ARTIFACT_TTL_SECONDS = float(os.getenv("ARTIFACT_TTL_SECONDS", str(30 * 24 * 3600)))
+ARTIFACT_QUOTA_BYTES = int(os.getenv("ARTIFACT_QUOTA_BYTES", str(1024 * 1024 * 1024)))
+ARTIFACT_SWEEP_INTERVAL = float(os.getenv("ARTIFACT_SWEEP_INTERVAL", "300"))
+
+# Key of the budget id HMAC, so download URLs cannot be derived from the figures in a budget.
+# When unset, a random key is generated once and kept in the index (shared by every worker)
+ARTIFACT_ID_SECRET = os.getenv("ARTIFACT_ID_SECRET")
+
+
+class ArtifactStore:
+    """
+    Persists each budget as a compact JSON record and renders the workbook only when
+    it is downloaded. Budgets are content-addressed: the id is a keyed hash (HMAC) of the
+    canonical record, so identical budgets share one record, one workbook and one stable
+    URL, but nobody without the key can compute the URL of a budget from its figures.
+    Files live in hash-prefix shard directories (budgets/ab/budget_ab....json)
+    and every file is listed in a SQLite index, so lookups, quotas and eviction never
+    scan directories. Rendered workbooks are a size-bounded LRU cache on top of the records.
+    """
+
+    def __init__(
+        self,
+        root=BUDGET_DIR,
+        render_cache_bytes=BUDGET_RENDER_CACHE_BYTES,
+        ttl_seconds=ARTIFACT_TTL_SECONDS,
+        quota_bytes=ARTIFACT_QUOTA_BYTES,
+        id_secret=ARTIFACT_ID_SECRET,
+    ):
+        self.root = root
+        self.render_cache_bytes = render_cache_bytes
+        self.ttl_seconds = ttl_seconds
+        self.quota_bytes = quota_bytes
+        self._lock = threading.Lock()
+        self.renders = 0
+        self.render_hits = 0
+        self.dedupe_hits = 0
+        self.evictions = {"ttl": 0, "quota": 0, "render_cache": 0}
+
+        os.makedirs(root, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(root, "index.sqlite3"), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")  # Shared by every uvicorn worker
+        self._conn.execute("PRAGMA synchronous=NORMAL")  # The index can be rebuilt; skip an fsync per write
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS artifacts ("
+            "path TEXT PRIMARY KEY, budget_id TEXT NOT NULL, kind TEXT NOT NULL, "
+            "size INTEGER NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_budget ON artifacts (budget_id, kind)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_accessed ON artifacts (kind, accessed_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS artifacts_created ON artifacts (created_at)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._id_key = (id_secret or self._stored_id_secret()).encode("utf-8")
+        self._migrate_flat_layout()
+
+    def _stored_id_secret(self):
+        """The generated id key; the first worker to start stores it, the others read it back."""
+        self._conn.execute(
+            "INSERT OR IGNORE INTO settings (key, value) VALUES ('artifact_id_secret', ?)", (secrets.token_hex(32),)
+        )
+        self._conn.commit()
+        return self._conn.execute("SELECT value FROM settings WHERE key = 'artifact_id_secret'").fetchone()[0]
+
+    # ------------------------------------------------------------------ layout
+
+    def shard_dir(self, budget_id):
+        return os.path.join(self.root, budget_id[:2])
+
+    def record_path(self, budget_id):
+        return os.path.join(self.shard_dir(budget_id), f"budget_{budget_id}.json")
+
+    def workbook_path(self, budget_id):
+        return os.path.join(self.shard_dir(budget_id), f"budget_{budget_id}.xlsx")
+
+    def _migrate_flat_layout(self):
+        """Moves files written before sharding (budgets/budget_<id>.*) into their shard and indexes them."""
+        for name in os.listdir(self.root):
+            if not name.startswith("budget_") or not name.endswith((".json", ".xlsx")):
+                continue
+            budget_id, extension = name[len("budget_"):].rsplit(".", 1)
+            target = self.record_path(budget_id) if extension == "json" else self.workbook_path(budget_id)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                # Every uvicorn worker runs this on startup: another one may have moved (or swept) the file
+                os.replace(os.path.join(self.root, name), target)
+                stat = os.stat(target)
+            except FileNotFoundError:
+                continue
+            self._index(target, budget_id, "record" if extension == "json" else "workbook", stat.st_size, stat.st_mtime)
+
+    # ------------------------------------------------------------------ index
+
+    def _index(self, path, budget_id, kind, size, created_at=None):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artifacts (path, budget_id, kind, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (path, budget_id, kind, size, created_at or now, now),
+            )
+            self._conn.commit()
+
+    def _lookup(self, budget_id, kind):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT path, created_at FROM artifacts WHERE budget_id = ? AND kind = ?", (budget_id, kind)
+            ).fetchone()
+
+    def _touch(self, budget_id):
+        """Marks every file of a budget as recently used (LRU order and TTL)."""
+        with self._lock:
+            self._conn.execute("UPDATE artifacts SET accessed_at = ? WHERE budget_id = ?", (time.time(), budget_id))
+            self._conn.commit()
+
+    def _remove(self, path, reason=None):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+            self._conn.commit()
+        if reason is not None:
+            self.evictions[reason] += 1
+
+    # ------------------------------------------------------------------ records & workbooks
+
+    def budget_key(self, budget_data):
+        """Content address of a budget: HMAC-SHA256 of its canonical {income, expenses, savings} record."""
+        record = {key: budget_data[key] for key in ("income", "expenses", "savings")}
+        canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+        return hmac.new(self._id_key, canonical.encode("utf-8"), hashlib.sha256).hexdigest()[:32], record
+
+    def _save_record(self, budget_data):
+        budget_id, record = self.budget_key(budget_data)
+        if self._lookup(budget_id, "record") is not None and os.path.exists(self.record_path(budget_id)):
+            # Same budget as before: reuse the existing record (and workbook, if rendered)
+            self._touch(budget_id)
+            self.dedupe_hits += 1
+            return budget_id
+
+        path = self.record_path(budget_id)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(record, f)
+        os.replace(tmp_path, path)
+        self._index(path, budget_id, "record", os.path.getsize(path))
+        return budget_id
+
+    def load_record(self, budget_id):
+        """Returns the stored {income, expenses, savings} of a budget, or None if unknown."""
+        try:
+            with open(self.record_path(budget_id)) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+
+    def last_modified(self, budget_id):
+        """Creation time of the budget (record, or workbook for pre-lazy-export budgets). None if unknown."""
+        row = self._lookup(budget_id, "record") or self._lookup(budget_id, "workbook")
+        return row[1] if row is not None else None
+
+    async def save(self, budget_data):
+        """Stores the budget record (no spreadsheet yet) unless it already exists, and returns its id."""
+        return await asyncio.to_thread(self._save_record, budget_data)
+
+    def _cached_workbook(self, budget_id):
+        """Path of an already rendered workbook (marking it recently used), or None."""
+        row = self._lookup(budget_id, "workbook")
+        if row is None:
+            return None
+        if not os.path.exists(row[0]):
+            self._remove(row[0])  # Removed behind our back (e.g. by another worker's sweep)
+            return None
+        self._touch(budget_id)
+        return row[0]
+
+    def _add_workbook(self, budget_id, path):
+        self._index(path, budget_id, "workbook", os.path.getsize(path))
+        self._enforce_render_cache(keep_path=path)
+
+    async def render_workbook(self, budget_id):
+        """Returns the path of the budget's workbook, rendering it on first download. None if unknown."""
+        path = await asyncio.to_thread(self._cached_workbook, budget_id)
+        if path is not None:
+            self.render_hits += 1
+            return path
+
+        record = await asyncio.to_thread(self.load_record, budget_id)
+        if record is None:
+            return None
+
+        # Render to a temporary name, then swap it in so concurrent downloads never see a partial file
+        path = self.workbook_path(budget_id)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        await run_export(write_budget_xlsx, record, tmp_path)
+        os.replace(tmp_path, path)
+        self.renders += 1
+        await asyncio.to_thread(self._add_workbook, budget_id, path)
+        return path
+
+    def _renderable_workbooks(self):
+        """Workbooks that can be rebuilt from their record, least recently downloaded first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT w.path, w.size FROM artifacts w WHERE w.kind = 'workbook' AND EXISTS "
+                "(SELECT 1 FROM artifacts r WHERE r.budget_id = w.budget_id AND r.kind = 'record') "
+                "ORDER BY w.accessed_at"
+            ).fetchall()
+
+    def _enforce_render_cache(self, keep_path=None):
+        with self._lock:
+            rendered_bytes = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM artifacts WHERE kind = 'workbook'"
+            ).fetchone()[0]
+        for path, size in self._renderable_workbooks():
+            if rendered_bytes <= self.render_cache_bytes:
+                break
+            if path == keep_path:
+                continue
+            self._remove(path, "render_cache")  # The JSON record stays, so it can be rendered again
+            rendered_bytes -= size
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def sweep(self):
+        """
+        Removes budgets not produced or downloaded within the TTL, then enforces the
+        total-size quota (rebuildable workbooks go first, then the oldest budgets).
+        """
+        with self._lock:
+            expired = self._conn.execute(
+                "SELECT path FROM artifacts WHERE accessed_at < ?", (time.time() - self.ttl_seconds,)
+            ).fetchall()
+        for (path,) in expired:
+            self._remove(path, "ttl")
+
+        with self._lock:
+            total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM artifacts").fetchone()[0]
+        if total_bytes <= self.quota_bytes:
+            return
+
+        for path, size in self._renderable_workbooks():
+            if total_bytes <= self.quota_bytes:
+                return
+            self._remove(path, "quota")
+            total_bytes -= size
+
+        with self._lock:
+            oldest = self._conn.execute("SELECT path, size FROM artifacts ORDER BY created_at").fetchall()
+        for path, size in oldest:
+            if total_bytes <= self.quota_bytes:
+                return
+            self._remove(path, "quota")
+            total_bytes -= size
+
+    async def run_lifecycle(self, interval=ARTIFACT_SWEEP_INTERVAL):
+        """Background task: sweeps the store every `interval` seconds until cancelled."""
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:  # Keep sweeping on transient errors (locked index, permissions)
+                print(f"Artifact sweep failed: {e}")
+            await asyncio.sleep(interval)
+
+    def stats(self):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT kind, COUNT(*), COALESCE(SUM(size), 0) FROM artifacts GROUP BY kind"
+            ).fetchall()
+        by_kind = {kind: {"files": files, "bytes": size} for kind, files, size in rows}
+        return {
+            "files": sum(kind["files"] for kind in by_kind.values()),
+            "bytes": sum(kind["bytes"] for kind in by_kind.values()),
+            "by_kind": by_kind,
+            "quota_bytes": self.quota_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "render_cache_bytes": self.render_cache_bytes,
+            "renders": self.renders,
+            "render_hits": self.render_hits,
+            "dedupe_hits": self.dedupe_hits,
+            "evictions": dict(self.evictions),
+        }
@@ -0,0 +1,188 @@
+import io
+import math
+import os
+import wave
+import numpy as np
+
+# Energy-based voice activity detection: frames quieter than VAD_SILENCE_DBFS are silence,
+# and a long recording may only be cut inside a silence of at least VAD_MIN_SILENCE_MS
+VAD_FRAME_MS = int(os.getenv("VAD_FRAME_MS", "30"))
+VAD_SILENCE_DBFS = float(os.getenv("VAD_SILENCE_DBFS", "-40"))
+VAD_MIN_SILENCE_MS = int(os.getenv("VAD_MIN_SILENCE_MS", "300"))
+
+# Normalized transcription audio: mono at AUDIO_TARGET_RATE (lower native rates are kept), silence trimmed
+# to AUDIO_TRIM_PAD_MS at each end
+AUDIO_TARGET_RATE = int(os.getenv("AUDIO_TARGET_RATE", "16000"))
+AUDIO_TRIM_PAD_MS = int(os.getenv("AUDIO_TRIM_PAD_MS", "200"))
+
+# Long recordings are normalized in blocks of this many seconds, so memory does not grow with their length
+_BLOCK_SECONDS = 10
+
+
+def read_wav(source):
+    """
+    Decodes a 16-bit PCM WAV file (bytes or a binary file object) into
+    (int16 samples of shape (frames, channels), sample rate). Files on disk are
+    memory-mapped instead of read, so long recordings are not copied into RAM.
+    """
+    fileobj = io.BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+    fileobj.seek(0)
+    with wave.open(fileobj, "rb") as wav:  # Explicit mode: spooled files report "w+b"
+        if wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+            raise ValueError("expected 16-bit PCM WAV audio")
+        channels, rate, frames = wav.getnchannels(), wav.getframerate(), wav.getnframes()
+        offset = fileobj.tell()  # wave stops reading at the start of the sample data
+
+    fileobj.seek(0, os.SEEK_END)
+    count = min(frames * channels, (fileobj.tell() - offset) // 2)  # The header may overstate a truncated upload
+    count -= count % channels
+    # A spooled upload that is still in memory wraps a BytesIO: memmap would call fileno() and roll it to disk
+    in_memory = getattr(fileobj, "_file", fileobj)
+    if isinstance(in_memory, io.BytesIO):
+        samples = np.frombuffer(in_memory.getvalue(), dtype="<i2", count=count, offset=offset)
+    else:
+        samples = np.memmap(source, dtype="<i2", mode="r", offset=offset, shape=(count,))
+    return samples.reshape(-1, channels), rate
+
+
+def to_mono(samples):
+    """Averages the channels of (frames, channels) int16 samples into one."""
+    if samples.shape[1] == 1:
+        return samples[:, 0]
+    return samples.mean(axis=1, dtype=np.float32).astype(np.int16)
+
+
+def write_wav(samples, rate):
+    """Encodes int16 mono samples as a WAV file."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.asarray(samples, dtype="<i2").tobytes())
+    return buffer.getvalue()
+
+
+def frame_energy_dbfs(samples, rate, frame_ms=VAD_FRAME_MS):
+    """
+    RMS energy of each frame_ms frame of mono int16 samples, in dB relative to full scale.
+    Frames are converted to float a block at a time, so only the per-frame result grows with the recording.
+    """
+    frame_length = max(1, rate * frame_ms // 1000)
+    count = len(samples) // frame_length
+    block = max(1, rate * _BLOCK_SECONDS // frame_length)
+    rms = np.empty(count, dtype=np.float32)
+    for first in range(0, count, block):
+        last = min(count, first + block)
+        frames = samples[first * frame_length:last * frame_length].reshape(last - first, frame_length)
+        frames = frames.astype(np.float32) / 32768.0
+        rms[first:last] = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10)), frame_length
+
+
+def speech_segments(
+    samples,
+    rate,
+    target_seconds,
+    max_seconds,
+    silence_dbfs=VAD_SILENCE_DBFS,
+    min_silence_ms=VAD_MIN_SILENCE_MS,
+    frame_ms=VAD_FRAME_MS,
+):
+    """
+    Splits mono int16 samples into (start, end) sample ranges of about target_seconds,
+    cutting in the middle of silences so no word is split. A segment that reaches
+    max_seconds without a silence is cut there. Segments that are silent throughout are dropped.
+    """
+    energy, frame_length = frame_energy_dbfs(samples, rate, frame_ms)
+    silent = energy < silence_dbfs
+
+    # Runs of silent frames: a change of state marks a run boundary
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.view(np.int8), [0]))))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    long_enough = (run_ends - run_starts) * frame_ms >= min_silence_ms
+    cut_points = ((run_starts[long_enough] + run_ends[long_enough]) // 2) * frame_length
+
+    target, limit = int(target_seconds * rate), int(max_seconds * rate)
+    boundaries, start = [], 0
+    for cut in cut_points:
+        while cut - start > limit:  # No usable silence in time: hard cut
+            boundaries.append((start, start + limit))
+            start += limit
+        if cut - start >= target:
+            boundaries.append((start, int(cut)))
+            start = int(cut)
+    while len(samples) - start > limit:
+        boundaries.append((start, start + limit))
+        start += limit
+    if start < len(samples):
+        boundaries.append((start, len(samples)))
+
+    # Keep segments with at least one voiced frame
+    voiced = np.concatenate(([0], np.cumsum(~silent)))
+    return [
+        (start, end) for start, end in boundaries
+        if voiced[min(-(-end // frame_length), len(silent))] - voiced[start // frame_length] > 0
+    ]
+
+
+def voiced_bounds(samples, rate, silence_dbfs=VAD_SILENCE_DBFS, pad_ms=AUDIO_TRIM_PAD_MS, frame_ms=VAD_FRAME_MS):
+    """
+    (start, end) frame range from the first to the last voiced frame of (frames, channels)
+    samples, widened by pad_ms on each side. (0, 0) when the recording is silent throughout.
+    """
+    frame_length = max(1, rate * frame_ms // 1000)
+    block = frame_length * max(1, rate * _BLOCK_SECONDS // frame_length)
+    first = last = None
+    for start in range(0, len(samples), block):
+        energy, _ = frame_energy_dbfs(to_mono(samples[start:start + block]), rate, frame_ms)
+        voiced = np.flatnonzero(energy >= silence_dbfs)
+        if len(voiced):
+            if first is None:
+                first = start + voiced[0] * frame_length
+            last = start + (voiced[-1] + 1) * frame_length
+    if first is None:
+        return 0, 0
+    pad = rate * pad_ms // 1000
+    return max(0, first - pad), min(len(samples), last + pad)
+
+
+def _resample_block(block, offset, rate, target_rate):
+    """
+    Resamples a float32 block that starts at input sample `offset` by linear interpolation,
+    returning the output samples that fall inside it. Downsampling first applies a boxcar
+    low-pass so that energy above the new Nyquist frequency does not alias.
+    """
+    if rate == target_rate:
+        return block
+    ratio = rate / target_rate
+    width = int(round(ratio))
+    if width > 1:
+        block = np.convolve(block, np.full(width, 1 / width, dtype=np.float32), mode="same")
+    first, last = math.ceil(offset / ratio), math.ceil((offset + len(block)) / ratio)
+    positions = np.arange(first, last) * ratio - offset
+    return np.interp(positions, np.arange(len(block)), block)
+
+
+def normalize_wav(source, output, target_rate=AUDIO_TARGET_RATE, trim=True):
+    """
+    Rewrites a 16-bit PCM WAV recording (bytes or a binary file) into `output` as mono
+    WAV downsampled to target_rate (a lower rate is kept: upsampling would only add bytes),
+    with leading and trailing silence trimmed. Works block by block over the memory-mapped
+    input. Returns the number of seconds trimmed from the start. Raises ValueError (or
+    wave.Error) when the source is not 16-bit PCM WAV.
+    """
+    samples, rate = read_wav(source)
+    start, end = voiced_bounds(samples, rate) if trim else (0, len(samples))
+    target_rate = min(rate, target_rate)
+
+    with wave.open(output, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(target_rate)
+        block = rate * _BLOCK_SECONDS
+        for block_start in range(start, end, block):
+            mono = to_mono(samples[block_start:min(block_start + block, end)]).astype(np.float32)
+            resampled = _resample_block(mono, block_start - start, rate, target_rate)
+            wav.writeframes(np.clip(np.round(resampled), -32768, 32767).astype("<i2").tobytes())
+    return start / rate
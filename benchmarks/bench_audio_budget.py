@@ -0,0 +1,188 @@
+"""
+Voice-to-budget latency benchmark: two client round trips vs /generate_budget_from_audio.
+
+Runs the app in-process with simulated backends, so only the request structure is measured:
+  - transcription: a live session that emits one final segment every --segment-seconds
+    (the batch path waits for all of them), like a backend decoding the recording in order
+  - LLM: every branch call takes --llm-seconds plus --prompt-seconds-per-kchar per 1000
+    prompt characters (the window and its context); income/expense extraction also takes
+    --extract-seconds-per-kchar per 1000 characters of new transcript, since its JSON output
+    grows with the number of items mentioned (concerns/advice prose does not)
+  - network: each client request pays --rtt seconds of round-trip time
+
+and compares the latency and the prompt tokens sent (~4 characters per token, as the
+LLM scheduler estimates them) of
+  two-trips  POST /transcribe_audio, then POST /generate_budget with the transcript
+  batch      POST /generate_budget_from_audio?stream=false (transcribe, then extract)
+  streamed   POST /generate_budget_from_audio?stream=true (extraction overlaps transcription)
+
+Usage:
+    python benchmarks/bench_audio_budget.py --segments 12 --segment-seconds 0.5 --llm-seconds 0.8 --rtt 0.15
+    python benchmarks/bench_audio_budget.py --segments 240 --segment-seconds 0.05 --window-chars 400
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")  # Never sent anywhere: the LLM is simulated
+os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark-placeholder")
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+os.environ.setdefault("BRANCH_CACHE_BACKEND", "none")
+os.environ.setdefault("BUDGET_CACHE_BACKEND", "none")
+
+import httpx
+from langchain.schema.runnable import RunnableLambda, RunnableParallel
+from langchain_core.messages import AIMessage
+
+import transcription
+from bench_chunked_transcription import synthetic_recording
+
+SENTENCES = [
+    "My salary is three thousand two hundred dollars a month after tax.",
+    "Rent takes one thousand one hundred and groceries about four hundred.",
+    "I also pay two hundred fifty for my car loan and ninety for the phone.",
+    "Utilities are around one hundred and twenty dollars every month.",
+    "I freelance on weekends which brings in roughly five hundred extra.",
+    "I worry that I am not saving enough for an emergency fund.",
+]
+
+
+class SimulatedStream(transcription._TranscriptStream):
+    """Emits one final segment every `interval` seconds once audio starts arriving."""
+
+    def __init__(self, segments, interval):
+        super().__init__()
+        self._emitter = asyncio.create_task(self._emit(segments, interval))
+
+    async def _emit(self, segments, interval):
+        for text in segments:
+            await asyncio.sleep(interval)
+            await self._events.put(("final", text))
+        await self._events.put(None)
+
+    async def send(self, chunk):
+        pass
+
+    async def end(self):
+        pass
+
+    async def aclose(self):
+        self._emitter.cancel()
+
+
+class SimulatedTranscriber:
+    def __init__(self, segments, interval):
+        self.segments = segments
+        self.interval = interval
+
+    async def transcribe(self, audio, content_type):
+        await asyncio.sleep(self.interval * len(self.segments))
+        return " ".join(self.segments)
+
+    async def open_stream(self, encoding=None, sample_rate=16000):
+        return SimulatedStream(self.segments, self.interval)
+
+
+# Characters sent to the simulated LLM (window + context), reset before each variant
+prompt_chars = {"sent": 0}
+
+
+def simulated_branch(name, llm_seconds, seconds_per_kchar, prompt_seconds_per_kchar):
+    """An LLM branch with a simulated latency that answers like the real prompts would."""
+
+    async def ainvoke(inputs):
+        extraction = name in ("income", "expenses")
+        sent = len(inputs["input"]) + len(inputs.get("context", ""))
+        prompt_chars["sent"] += sent
+        await asyncio.sleep(
+            llm_seconds
+            + prompt_seconds_per_kchar * sent / 1000
+            + (seconds_per_kchar * len(inputs["input"]) / 1000 if extraction else 0)
+        )
+        if extraction:
+            return AIMessage(content='[{"source": "salary", "category": "rent", "amount": 100}]')
+        return AIMessage(content=f"{name} for: {inputs['input'][:40]}")
+
+    return RunnableLambda(lambda inputs: None, afunc=ainvoke, name=f"{name}_branch")
+
+
+def install_simulated_llm(pipeline, llm_seconds, seconds_per_kchar, prompt_seconds_per_kchar):
+    pipeline.init_llm()
+    branches = {
+        name: simulated_branch(name, llm_seconds, seconds_per_kchar, prompt_seconds_per_kchar)
+        for name in ("income", "expenses", "concerns", "advice")
+    }
+    pipeline.income_branch = pipeline.income_window_chain = branches["income"]
+    pipeline.expenses_branch = pipeline.expenses_window_chain = branches["expenses"]
+    pipeline.concerns_branch = branches["concerns"]
+    pipeline.advice_branch = branches["advice"]
+    pipeline.budget_parallel_chain = RunnableParallel(branches)
+
+
+async def run(args):
+    import main as api
+    import langchain_pipeline
+
+    install_simulated_llm(
+        langchain_pipeline, args.llm_seconds, args.extract_seconds_per_kchar, args.prompt_seconds_per_kchar
+    )
+    segments = [SENTENCES[i % len(SENTENCES)] for i in range(args.segments)]
+    api.transcriber = SimulatedTranscriber(segments, args.segment_seconds)
+    audio_bytes = synthetic_recording(args.segments * args.segment_seconds / 60)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench", timeout=None) as client:
+
+        async def post(path, **kwargs):
+            await asyncio.sleep(args.rtt)  # Request out, response back
+            response = await client.post(path, **kwargs)
+            response.raise_for_status()
+            return response.json()
+
+        async def two_trips():
+            transcript = await post("/transcribe_audio?chunked=false", files={"file": ("clip.wav", audio_bytes, "audio/wav")})
+            return await post("/generate_budget", json={"prompt": transcript["transcription"]})
+
+        async def one_request(stream):
+            return await post(
+                f"/generate_budget_from_audio?stream={str(stream).lower()}",
+                files={"file": ("clip.wav", audio_bytes, "audio/wav")},
+            )
+
+        variants = {"two-trips": two_trips, "batch": lambda: one_request(False), "streamed": lambda: one_request(True)}
+        print(
+            f"{args.segments} segments every {args.segment_seconds:g} s, LLM {args.llm_seconds:g} s per call "
+            f"+ {args.prompt_seconds_per_kchar:g} s per 1000 prompt chars "
+            f"+ {args.extract_seconds_per_kchar:g} s per 1000 chars extracted, RTT {args.rtt:g} s\n"
+        )
+        print(f"{'variant':<12}{'seconds':>9}{'prompt tokens':>15}")
+        for name, variant in variants.items():
+            prompt_chars["sent"] = 0
+            start = time.perf_counter()
+            await variant()
+            print(f"{name:<12}{time.perf_counter() - start:>9.2f}{prompt_chars['sent'] // 4:>15}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=12, help="final segments in the recording")
+    parser.add_argument("--segment-seconds", type=float, default=0.5, help="decode time per segment")
+    parser.add_argument("--llm-seconds", type=float, default=0.8, help="latency of each LLM branch call")
+    parser.add_argument("--extract-seconds-per-kchar", type=float, default=1.5, help="extraction cost per 1000 chars")
+    parser.add_argument("--prompt-seconds-per-kchar", type=float, default=0.1, help="prompt processing per 1000 chars")
+    parser.add_argument("--rtt", type=float, default=0.15, help="client round-trip time per request")
+    parser.add_argument("--window-chars", type=int, default=120, help="BUDGET_SEGMENT_MIN_CHARS")
+    parser.add_argument("--window-max-chars", type=int, default=3200, help="BUDGET_SEGMENT_MAX_CHARS")
+    parser.add_argument("--context-chars", type=int, default=400, help="BUDGET_SEGMENT_CONTEXT_CHARS")
+    args = parser.parse_args()
+    os.environ["BUDGET_SEGMENT_MIN_CHARS"] = str(args.window_chars)
+    os.environ["BUDGET_SEGMENT_MAX_CHARS"] = str(args.window_max_chars)
+    os.environ["BUDGET_SEGMENT_CONTEXT_CHARS"] = str(args.context_chars)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
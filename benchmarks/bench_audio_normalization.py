@@ -0,0 +1,138 @@
+"""
+Audio normalization benchmark: upload bytes and end-to-end latency with and without
+downmixing to 16 kHz mono and trimming silence (AUDIO_NORMALIZE).
+
+Builds a browser-style recording (48 kHz stereo with silence before and after the speech,
+or loads --wav) and reports:
+  - bytes sent to the transcription backend, raw vs normalized, and the saving
+  - normalization cost (ms per minute of audio)
+  - end-to-end /transcribe_audio latency through a Deepgram stub transport that is
+    throttled to --uplink-mbps, so upload time dominates as it does on a slow link
+
+Set --deepgram-url (with DEEPGRAM_API_KEY) to send both variants to a real endpoint instead.
+
+Usage:
+    python benchmarks/bench_audio_normalization.py --minutes 2 --uplink-mbps 10
+    python benchmarks/bench_audio_normalization.py --wav voice_note.wav --deepgram-url https://api.deepgram.com
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark-placeholder")  # Only sent when --deepgram-url is given
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+import httpx
+
+from audio_processing import normalize_wav, read_wav
+from bench_chunked_transcription import synthetic_recording
+
+
+class ThrottledDeepgramTransport(httpx.AsyncBaseTransport):
+    """Stands in for Deepgram: consumes the body at uplink_mbps and returns a fixed transcript."""
+
+    def __init__(self, uplink_mbps):
+        self.bytes_per_second = uplink_mbps * 1e6 / 8
+        self.received = 0
+
+    async def handle_async_request(self, request):
+        async for chunk in request.stream:
+            self.received += len(chunk)
+            await asyncio.sleep(len(chunk) / self.bytes_per_second)
+        return httpx.Response(200, json={"results": {"channels": [{"alternatives": [{"transcript": "ok"}]}]}})
+
+
+def browser_recording(minutes, lead_seconds=3.0, tail_seconds=3.0, rate=48000):
+    """Synthetic speech at 48 kHz stereo, padded with quiet room noise at both ends."""
+    speech, _ = read_wav(synthetic_recording(minutes, rate=rate))
+    rng = np.random.default_rng(1)
+    lead = rng.normal(0, 30, int(lead_seconds * rate)).astype(np.int16)
+    tail = rng.normal(0, 30, int(tail_seconds * rate)).astype(np.int16)
+    mono = np.concatenate((lead, speech[:, 0], tail))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(2)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(np.repeat(mono[:, None], 2, axis=1).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+async def transcribe_once(api, audio_bytes, normalize, chunked, transport):
+    """One /transcribe_audio request; transport is the stub, or None to open the real Deepgram client."""
+    if transport is None:
+        await api.transcriber.start()
+    else:
+        api.transcriber.client = httpx.AsyncClient(base_url="http://deepgram.stub", transport=transport)
+
+    query = f"?normalize={str(normalize).lower()}&chunked={str(chunked).lower()}"
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench", timeout=None) as client:
+            start = time.perf_counter()
+            response = await client.post(f"/transcribe_audio{query}", files={"file": ("clip.wav", audio_bytes, "audio/wav")})
+            elapsed = time.perf_counter() - start
+    finally:
+        await api.transcriber.aclose()
+    response.raise_for_status()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="16-bit PCM WAV recording (default: synthetic 48 kHz stereo)")
+    parser.add_argument("--minutes", type=float, default=2, help="length of the synthetic recording")
+    parser.add_argument("--uplink-mbps", type=float, default=10, help="throttle of the stub Deepgram transport")
+    parser.add_argument("--chunked", action="store_true", help="also split at silences (default: one request)")
+    parser.add_argument("--deepgram-url", help="send to this Deepgram endpoint instead of the stub")
+    args = parser.parse_args()
+
+    if args.wav:
+        with open(args.wav, "rb") as f:
+            audio_bytes = f.read()
+    else:
+        audio_bytes = browser_recording(args.minutes)
+
+    samples, rate = read_wav(audio_bytes)
+    duration = len(samples) / rate
+    output = io.BytesIO()
+    start = time.perf_counter()
+    trimmed = normalize_wav(audio_bytes, output)
+    cost = time.perf_counter() - start
+    normalized = output.getvalue()
+    with wave.open(io.BytesIO(normalized)) as wav:
+        kept = wav.getnframes() / wav.getframerate()
+
+    print(f"recording: {duration:.1f} s, {samples.shape[1]} channel(s) at {rate} Hz, {len(audio_bytes) / 1e6:.2f} MB")
+    print(f"normalized: {kept:.1f} s mono at 16 kHz ({trimmed:.2f} s trimmed from the start), {len(normalized) / 1e6:.2f} MB")
+    print(f"saving: {1 - len(normalized) / len(audio_bytes):.1%} of upload bytes")
+    print(f"normalization: {cost * 1000:.0f} ms ({cost * 1000 / (duration / 60):.0f} ms per audio minute)\n")
+
+    os.environ["MAX_UPLOAD_BYTES"] = str(len(audio_bytes) + 1024 * 1024)
+    import main as api
+
+    if args.deepgram_url:
+        api.transcriber.base_url = args.deepgram_url
+        link = args.deepgram_url
+    else:
+        link = f"stub at {args.uplink_mbps:g} Mbit/s"
+
+    print(f"{'upload':<12}{'sent MB':>9}{'seconds':>9}  ({link})")
+    for normalize in (False, True):
+        transport = None if args.deepgram_url else ThrottledDeepgramTransport(args.uplink_mbps)
+        elapsed = asyncio.run(transcribe_once(api, audio_bytes, normalize, args.chunked, transport))
+        sent = f"{'-':>9}" if transport is None else f"{transport.received / 1e6:>9.2f}"
+        print(f"{'normalized' if normalize else 'raw':<12}{sent}{elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Speedup benchmark: chunked (silence-split, parallel) vs single-shot transcription of long recordings.
+
+Builds a long recording (or loads --wav), then transcribes it
+  single   as one blob through transcriber.transcribe
+  chunked  through transcribe_recording: NumPy energy VAD, split at silences, segments
+           decoded concurrently and stitched back in order
+and reports wall time, speedup, the VAD/split cost and the segment layout.
+
+Backends:
+  vosk       the real offline decoder in its process pool (needs VOSK_MODEL_PATH)
+  deepgram   the remote API (needs DEEPGRAM_API_KEY, or --deepgram-url for a stub)
+  simulated  a CPU-bound stand-in that burns ~--cost seconds per second of audio in a
+             process pool, so the speedup can be measured without a model or network
+
+Usage:
+    python benchmarks/bench_chunked_transcription.py --minutes 10 --backend simulated --workers 4
+    python benchmarks/bench_chunked_transcription.py --wav voice_note.wav --backend vosk
+"""
+import argparse
+import asyncio
+import io
+import os
+import sys
+import time
+import wave
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transcription
+from audio_processing import read_wav, speech_segments, to_mono, write_wav
+
+
+def synthetic_recording(minutes, rate=16000, seed=0):
+    """Speech-like recording: 2-12 s bursts of modulated tones and noise separated by 0.4-1.5 s pauses."""
+    rng = np.random.default_rng(seed)
+    total = int(minutes * 60 * rate)
+    parts, length = [], 0
+    while length < total:
+        burst = int(rng.uniform(2, 12) * rate)
+        t = np.arange(burst) / rate
+        voice = 0.3 * np.sin(2 * np.pi * rng.uniform(120, 260) * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+        pause = int(rng.uniform(0.4, 1.5) * rate)
+        parts += [voice + rng.normal(0, 0.02, burst), rng.normal(0, 0.002, pause)]
+        length += burst + pause
+    samples = np.concatenate(parts)[:total]
+    return write_wav((np.clip(samples, -1, 1) * 32767).astype(np.int16), rate)
+
+
+def _simulated_decode(audio_bytes, cost):
+    """Busy CPU work proportional to the audio length, like a real decoder."""
+    with wave.open(io.BytesIO(audio_bytes)) as wav:
+        seconds = wav.getnframes() / wav.getframerate()
+    deadline = time.process_time() + seconds * cost
+    while time.process_time() < deadline:
+        np.fft.rfft(np.ones(4096))
+    return f"[{seconds:.1f}s]"
+
+
+class SimulatedTranscriber:
+    """Transcriber interface over a process pool running _simulated_decode."""
+
+    def __init__(self, workers, cost):
+        self.workers = workers
+        self.cost = cost
+        self.executor = None
+
+    def config_error(self):
+        return None
+
+    async def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    async def warmup(self):
+        await asyncio.gather(*(asyncio.to_thread(self.executor.submit(int).result) for _ in range(self.workers)))
+
+    async def aclose(self):
+        self.executor.shutdown()
+
+    async def transcribe(self, audio_bytes, content_type):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, _simulated_decode, audio_bytes, self.cost)
+
+
+def build_transcriber(args):
+    if args.backend == "simulated":
+        return SimulatedTranscriber(args.workers, args.cost)
+    if args.backend == "vosk":
+        return transcription.VoskTranscriber(workers=args.workers)
+    return transcription.DeepgramTranscriber(base_url=args.deepgram_url)
+
+
+async def run(args, audio_bytes):
+    transcriber = build_transcriber(args)
+    config_error = transcriber.config_error()
+    if config_error is not None:
+        sys.exit(f"{args.backend} backend unavailable: {config_error}")
+
+    await transcriber.start()
+    try:
+        await transcriber.warmup()
+
+        start = time.perf_counter()
+        await transcriber.transcribe(audio_bytes, "audio/wav")
+        single = time.perf_counter() - start
+
+        start = time.perf_counter()
+        _, segments = await transcription.transcribe_recording(transcriber, audio_bytes, "audio/wav", min_seconds=0)
+        chunked = time.perf_counter() - start
+    finally:
+        await transcriber.aclose()
+    return single, chunked, segments
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", choices=["simulated", "vosk", "deepgram"], default="simulated")
+    parser.add_argument("--wav", help="16-bit PCM WAV recording (default: synthetic)")
+    parser.add_argument("--minutes", type=float, default=10, help="length of the synthetic recording")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="decoder processes")
+    parser.add_argument("--cost", type=float, default=0.05, help="simulated CPU seconds per audio second")
+    parser.add_argument("--deepgram-url", default=transcription.DEEPGRAM_BASE_URL)
+    args = parser.parse_args()
+
+    if args.wav:
+        with open(args.wav, "rb") as f:
+            audio_bytes = f.read()
+    else:
+        audio_bytes = synthetic_recording(args.minutes)
+
+    # Cost of the VAD itself (runs before any decoding)
+    start = time.perf_counter()
+    samples, rate = read_wav(audio_bytes)
+    mono = to_mono(samples)
+    ranges = speech_segments(
+        mono, rate, transcription.TRANSCRIPTION_CHUNK_TARGET_SECONDS, transcription.TRANSCRIPTION_CHUNK_MAX_SECONDS
+    )
+    vad = time.perf_counter() - start
+    duration = len(mono) / rate
+    lengths = [(end - begin) / rate for begin, end in ranges]
+    print(f"recording: {duration / 60:.1f} min, {len(audio_bytes) / 1e6:.1f} MB")
+    print(
+        f"VAD + split: {vad * 1000:.1f} ms -> {len(ranges)} segments "
+        f"({min(lengths, default=0):.1f}-{max(lengths, default=0):.1f} s, {sum(lengths):.0f} s voiced)"
+    )
+
+    single, chunked, segments = asyncio.run(run(args, audio_bytes))
+    print(f"\n{'mode':<10}{'wall s':>9}{'x realtime':>12}")
+    print(f"{'single':<10}{single:>9.2f}{duration / single:>12.1f}")
+    print(f"{'chunked':<10}{chunked:>9.2f}{duration / chunked:>12.1f}")
+    print(f"\nspeedup {single / chunked:.1f}x with {args.workers} workers ({args.backend} backend)")
+    print("first segments:", segments[:3])
+
+
+if __name__ == "__main__":
+    main()
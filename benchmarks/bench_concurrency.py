@@ -0,0 +1,93 @@
+"""
+Concurrency benchmark for the budget pipeline.
+
+Replaces the Groq-backed branches with stubs that sleep for a fixed "LLM latency"
+and fires N budget requests at once, first through the blocking pipeline and then
+through `arun_budget_pipeline`. With the async pipeline, N requests should finish
+in roughly one LLM latency instead of N.
+
+Usage:
+    python benchmarks/bench_concurrency.py --requests 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")  # Never used: the LLM is stubbed out
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda, RunnableParallel
+
+import langchain_pipeline
+from budget_cache import NullCache
+
+BRANCH_RESPONSES = {
+    "income": '[{"source": "Salary", "amount": 5000}]',
+    "expenses": '[{"category": "Rent", "amount": 1500}, {"category": "Food", "amount": 400}]',
+    "concerns": "Wants to build an emergency fund.",
+    "advice": "- Save 20% of income\n- Keep three months of expenses in cash",
+}
+
+
+def make_stub_chain(latency):
+    """Builds a drop-in replacement for budget_parallel_chain with a fixed per-call latency."""
+
+    def make_branch(content):
+        def invoke(_):
+            time.sleep(latency)
+            return AIMessage(content=content)
+
+        async def ainvoke(_):
+            await asyncio.sleep(latency)
+            return AIMessage(content=content)
+
+        return RunnableLambda(invoke, afunc=ainvoke)
+
+    return RunnableParallel(**{name: make_branch(content) for name, content in BRANCH_RESPONSES.items()})
+
+
+async def run_blocking(n):
+    """Mimics the old endpoints: an async handler calling the synchronous pipeline."""
+
+    async def handler(i):
+        return langchain_pipeline.run_budget_pipeline(f"Request {i}: I earn $5000 and pay $1500 rent")
+
+    return await asyncio.gather(*(handler(i) for i in range(n)))
+
+
+async def run_async(n):
+    """The new endpoints: awaiting arun_budget_pipeline."""
+    return await asyncio.gather(
+        *(langchain_pipeline.arun_budget_pipeline(f"Request {i}: I earn $5000 and pay $1500 rent") for i in range(n))
+    )
+
+
+def timed(label, coro_factory, n, latency):
+    start = time.perf_counter()
+    results = asyncio.run(coro_factory(n))
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for r in results if "error" in r)
+    print(f"{label:<10} {n:>4} requests  {elapsed:7.2f}s  ({elapsed / latency:5.1f}x LLM latency, {errors} errors)")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="number of simultaneous budget requests")
+    parser.add_argument("--latency", type=float, default=0.5, help="simulated latency of one LLM call in seconds")
+    args = parser.parse_args()
+
+    langchain_pipeline.budget_parallel_chain = make_stub_chain(args.latency)
+    # Both runs send the same prompts: without this the async run would only measure result-cache hits
+    langchain_pipeline.budget_cache = NullCache()
+
+    blocking = timed("blocking", run_blocking, args.requests, args.latency)
+    concurrent = timed("async", run_async, args.requests, args.latency)
+    print(f"speedup    {blocking / concurrent:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
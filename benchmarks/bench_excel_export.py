@@ -0,0 +1,105 @@
+"""
+Excel export benchmark: old pandas path vs the streaming xlsx writer.
+
+For a small budget and a 10k-line budget it times:
+  pandas     three DataFrames + pd.concat + df.to_excel (the previous endpoint code)
+  streaming  budget_export.write_budget_xlsx (streamed SpreadsheetML, no pandas)
+and, for the streaming writer, how long the event loop is blocked per export when
+it runs inline versus through the export pool (budget_export.run_export).
+
+Usage:
+    python benchmarks/bench_excel_export.py --repeat 3
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import budget_export
+
+
+def make_budget(lines):
+    expenses = [{"category": f"Expense {i}", "amount": round(10 + i * 1.5, 2)} for i in range(lines)]
+    income = 1_000_000
+    return {"income": income, "expenses": expenses, "savings": max(0, income - sum(e["amount"] for e in expenses))}
+
+
+def pandas_export(budget_data, file_path):
+    """The export code that used to live in both budget endpoints."""
+    import pandas as pd
+
+    df = pd.DataFrame(budget_data["expenses"])
+    income_row = pd.DataFrame([{"category": "Income", "amount": budget_data["income"]}])
+    savings_row = pd.DataFrame([{"category": "Recommended Savings", "amount": budget_data["savings"]}])
+    df = pd.concat([income_row, df, savings_row], ignore_index=True)
+    df.to_excel(file_path, index=False)
+
+
+def best_of(fn, budget_data, repeat):
+    best = float("inf")
+    with tempfile.TemporaryDirectory() as tmp:
+        for i in range(repeat):
+            path = os.path.join(tmp, f"budget_{i}.xlsx")
+            start = time.perf_counter()
+            fn(budget_data, path)
+            best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def max_loop_stall(export, budget_data, directory, exports=4):
+    """Runs exports concurrently with a 1 ms ticker and reports the longest gap between ticks."""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    await asyncio.gather(*(export(budget_data, os.path.join(directory, f"stall_{i}.xlsx")) for i in range(exports)))
+    done = True
+    await task
+    return stall
+
+
+async def inline_export(budget_data, file_path):
+    budget_export.write_budget_xlsx(budget_data, file_path)
+
+
+async def pooled_export(budget_data, file_path):
+    await budget_export.run_export(budget_export.write_budget_xlsx, budget_data, file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 10_000], help="expense lines per budget")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'lines':>7}{'pandas ms':>12}{'streaming ms':>15}{'speedup':>9}{'inline stall ms':>18}{'pooled stall ms':>18}")
+        for lines in args.sizes:
+            budget_data = make_budget(lines)
+            t_pandas = best_of(pandas_export, budget_data, args.repeat)
+            t_stream = best_of(budget_export.write_budget_xlsx, budget_data, args.repeat)
+            stall_inline = asyncio.run(max_loop_stall(inline_export, budget_data, tmp))
+            stall_pooled = asyncio.run(max_loop_stall(pooled_export, budget_data, tmp))
+            budget_export.shutdown_export_executor()
+            print(
+                f"{lines:>7}{t_pandas * 1000:>12.1f}{t_stream * 1000:>15.1f}{t_pandas / t_stream:>8.1f}x"
+                f"{stall_inline * 1000:>18.1f}{stall_pooled * 1000:>18.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
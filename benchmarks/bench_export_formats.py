@@ -0,0 +1,62 @@
+"""
+Throughput of the streaming budget export formats (CSV, NDJSON, Parquet, XLSX).
+
+Each format's chunk generator is consumed end to end, the way StreamingResponse
+does, for budgets of several sizes. Reports bytes produced, time, rows/s and MB/s
+so the cheapest format for an integration can be picked. Parquet is skipped when
+pyarrow is not installed.
+
+Usage:
+    python benchmarks/bench_export_formats.py --sizes 100 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from budget_export import EXPORT_FORMATS, ExportUnavailableError
+
+
+def make_budget(lines):
+    expenses = [{"category": f"Expense {i}", "amount": round(10 + i * 1.5, 2)} for i in range(lines)]
+    income = 10_000_000
+    return {"income": income, "expenses": expenses, "savings": max(0, income - sum(e["amount"] for e in expenses))}
+
+
+def consume(iter_chunks, budget_data):
+    total = chunks = 0
+    for chunk in iter_chunks(budget_data):
+        total += len(chunk)
+        chunks += 1
+    return total, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10_000, 100_000], help="expense lines per budget")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'format':<9}{'lines':>8}{'bytes':>12}{'chunks':>8}{'ms':>10}{'rows/s':>12}{'MB/s':>8}")
+    for lines in args.sizes:
+        budget_data = make_budget(lines)
+        for name, (_, iter_chunks) in EXPORT_FORMATS.items():
+            best = float("inf")
+            try:
+                for _ in range(args.repeat):
+                    start = time.perf_counter()
+                    size, chunks = consume(iter_chunks, budget_data)
+                    best = min(best, time.perf_counter() - start)
+            except ExportUnavailableError as e:
+                print(f"{name:<9}{lines:>8}  skipped: {e}")
+                continue
+            print(
+                f"{name:<9}{lines:>8}{size:>12}{chunks:>8}{best * 1000:>10.1f}"
+                f"{(lines + 2) / best:>12.0f}{size / best / 1e6:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
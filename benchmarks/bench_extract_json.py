@@ -0,0 +1,137 @@
+"""
+Microbenchmark and adversarial-input checks for the JSON extractor.
+
+Compares the old greedy regex fallback (`(\\{.*\\}|\\[.*\\])` with DOTALL) with the
+single-pass JSONScanner on:
+  - correctness cases (prose between two JSON blocks, braces inside strings,
+    escaped quotes, chunk boundaries inside escapes, mismatched brackets)
+  - growing adversarial inputs, checking that scanner time grows linearly
+
+Exits with a non-zero status if a correctness case fails or scaling is super-linear.
+
+Usage:
+    python benchmarks/bench_extract_json.py --size 20000
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_scanner import JSONScanner, find_first_json
+
+LEGACY_PATTERN = re.compile(r"(\{.*\}|\[.*\])", re.DOTALL)
+
+
+def legacy_extract(text):
+    """The previous extract_json fallback."""
+    match = LEGACY_PATTERN.search(text)
+    if match:
+        try:
+            return json.loads(match.group())
+        except (json.JSONDecodeError, RecursionError):
+            pass
+    return None
+
+
+CORRECTNESS_CASES = [
+    ("plain object", '{"a": 1}', {"a": 1}),
+    ("wrapped in prose", 'Here you go: [{"source": "Job", "amount": 5000}] Hope it helps!', [{"source": "Job", "amount": 5000}]),
+    ("two blocks", 'Income: [{"amount": 1}]\nExpenses: [{"amount": 2}]', [{"amount": 1}]),
+    ("braces in strings", 'Result: {"note": "use } and ] freely", "x": [1]} done', {"note": "use } and ] freely", "x": [1]}),
+    ("escaped quotes", 'x {"a": "say \\"hi\\" {"} y', {"a": 'say "hi" {'}),
+    ("escaped backslash", '{"path": "C:\\\\"} tail }', {"path": "C:\\"}),
+    ("prose braces first", 'Use the {format} below: {"a": 2}', {"a": 2}),
+    ("mismatched bracket", 'oops [1, 2} then [3]', [3]),
+    ("no json", "I could not find any numbers.", None),
+    ("unterminated", '{"a": [1, 2', None),
+    ("unclosed prose brace", 'He said "hi {" then [1]', [1]),
+    ("too deeply nested", "[" * 5000 + "]" * 5000 + ' then {"a": 1}', {"a": 1}),
+]
+
+
+def chunked(text, size):
+    scanner = JSONScanner()
+    for i in range(0, len(text), size):
+        value = scanner.feed(text[i:i + size])
+        if scanner.done:
+            return value
+    return scanner.finish()
+
+
+def check_correctness():
+    failures = 0
+    for label, text, expected in CORRECTNESS_CASES:
+        results = {"whole": find_first_json(text)}
+        for size in (1, 2, 3, 7):
+            results[f"chunks of {size}"] = chunked(text, size)
+        for how, value in results.items():
+            if value != expected:
+                failures += 1
+                print(f"FAIL {label} ({how}): expected {expected!r}, got {value!r}")
+        legacy = "ok" if legacy_extract(text) == expected else "wrong"
+        print(f"  {label:<20} scanner ok   legacy regex {legacy}")
+    return failures
+
+
+ADVERSARIAL_INPUTS = {
+    "unclosed braces": lambda n: "{" * n,
+    "unclosed brackets + prose": lambda n: "[a " * (n // 3),
+    "long string, no close": lambda n: '{"a": "' + "x" * n,
+    "many escapes": lambda n: '{"a": "' + "\\\"" * (n // 2),
+    "many bad candidates": lambda n: "{x} " * (n // 4) + '{"ok": 1}',
+    "unclosed prose quotes": lambda n: 'x {" ' * (n // 5) + "[1]",
+    "nested then garbage": lambda n: "[" * (n // 2) + "]" * (n // 2 - 1) + "}",
+}
+
+
+def best_of(fn, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_scaling(size):
+    failures = 0
+    print(f"\n{'input':<28}{'n':>9}{'scanner ms':>12}{'4n ms':>10}{'ratio':>8}{'regex ms':>11}")
+    for label, make in ADVERSARIAL_INPUTS.items():
+        small, large = make(size), make(size * 4)
+        t_small = best_of(find_first_json, small)
+        t_large = best_of(find_first_json, large)
+        ratio = t_large / t_small if t_small else 0.0
+        # Regex is only timed at the small size: it is quadratic on several of these inputs
+        t_regex = best_of(legacy_extract, small, repeat=1)
+        print(f"{label:<28}{len(small):>9}{t_small * 1000:>12.2f}{t_large * 1000:>10.2f}{ratio:>8.1f}{t_regex * 1000:>11.2f}")
+        if ratio > 8:  # 4x the input should cost ~4x the time; allow noise, flag quadratic growth (~16x)
+            failures += 1
+            print(f"FAIL {label}: scanner time grew {ratio:.1f}x for 4x input")
+    return failures
+
+
+def check_throughput(size):
+    payload = json.dumps([{"category": f"Item {i}", "amount": i} for i in range(size // 40)])
+    text = "Sure! Here is the JSON you asked for:\n" + payload + "\nLet me know if you need anything else."
+    t_scan = best_of(find_first_json, text, repeat=5)
+    t_regex = best_of(legacy_extract, text, repeat=5)
+    print(f"\nwell-formed {len(text)} chars: scanner {t_scan * 1000:.2f} ms, legacy regex {t_regex * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=20000, help="base size of the adversarial inputs")
+    args = parser.parse_args()
+
+    failures = check_correctness()
+    failures += check_scaling(args.size)
+    check_throughput(args.size * 10)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
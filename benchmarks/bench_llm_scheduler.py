@@ -0,0 +1,153 @@
+"""
+LLM scheduler benchmark: a burst of background jobs plus a stream of interactive requests
+against a rate-limited Groq stand-in.
+
+The stub transport enforces a requests-per-minute budget the way Groq does (a bucket of one
+minute's requests, refilled continuously) and answers 429 with retry-after when it is empty.
+Each budget request makes four LLM calls. Two client setups are compared:
+  unscheduled  plain ChatGroq with max_retries=2: every call is sent at once and 429s are
+               retried by the SDK (the previous setup)
+  scheduled    ScheduledChatGroq: calls wait in llm_scheduler (token buckets sized to the
+               same limit, interactive ahead of batch, extraction ahead of advice)
+
+Reports the 429s the stub returned, failed requests, and latency per request class.
+
+Usage:
+    python benchmarks/bench_llm_scheduler.py --rpm 300 --jobs 90 --interactive 20 --interval 1
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")  # Never sent anywhere: Groq is stubbed
+os.environ.setdefault("BRANCH_CACHE_BACKEND", "none")
+os.environ.setdefault("BUDGET_CACHE_BACKEND", "none")
+
+import httpx
+from langchain_groq import ChatGroq
+
+import langchain_pipeline
+
+
+class RateLimitedGroqTransport(httpx.AsyncBaseTransport):
+    """Stands in for Groq: a per-minute request bucket, `latency` seconds per answered call."""
+
+    def __init__(self, rpm, latency):
+        self.rpm = rpm
+        self.latency = latency
+        self.available = float(rpm)
+        self.updated = time.monotonic()
+        self.calls = 0
+        self.rejected = 0
+
+    async def handle_async_request(self, request):
+        await request.aread()
+        now = time.monotonic()
+        self.available = min(self.rpm, self.available + (now - self.updated) * self.rpm / 60)
+        self.updated = now
+        self.calls += 1
+        if self.available < 1:
+            self.rejected += 1
+            retry_after = (1 - self.available) * 60 / self.rpm
+            return httpx.Response(
+                429,
+                json={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                headers={"retry-after": f"{retry_after:.2f}"},
+            )
+        self.available -= 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, json={
+            "id": "stub", "object": "chat.completion", "created": 0, "model": langchain_pipeline.LLM_MODEL,
+            "choices": [{"index": 0, "finish_reason": "stop", "message": {
+                "role": "assistant", "content": '[{"source": "salary", "category": "rent", "amount": 100}]',
+            }}],
+            "usage": {"prompt_tokens": 60, "completion_tokens": 20, "total_tokens": 80},
+        })
+
+
+def client_class(base, transport, max_retries=None):
+    """The model class init_llm builds, wired to the stub transport."""
+
+    class BenchChatGroq(base):
+        def __init__(self, **kwargs):
+            kwargs["http_async_client"] = httpx.AsyncClient(transport=transport)
+            if max_retries is not None:
+                kwargs["max_retries"] = max_retries
+            super().__init__(**kwargs)
+
+    return BenchChatGroq
+
+
+async def run_setup(args, model_class):
+    langchain_pipeline.llm = None
+    langchain_pipeline.llm_scheduler = langchain_pipeline.LLMScheduler(args.rpm, 0)
+    langchain_pipeline.ScheduledChatGroq, scheduled_class = model_class, langchain_pipeline.ScheduledChatGroq
+    try:
+        langchain_pipeline.init_llm()
+    finally:
+        langchain_pipeline.ScheduledChatGroq = scheduled_class
+
+    results = {"interactive": [], "batch": []}
+    failures = {"interactive": 0, "batch": 0}
+
+    async def budget(request_class, i):
+        langchain_pipeline.llm_request_class.set(request_class)  # Each request runs in its own task
+        start = time.perf_counter()
+        try:
+            await langchain_pipeline.arun_budget_pipeline(f"{request_class} {i}: I earn $5000 and pay $1500 rent")
+        except Exception:
+            failures[request_class] += 1
+            return
+        results[request_class].append(time.perf_counter() - start)
+
+    async def interactive_stream():
+        tasks = []
+        for i in range(args.interactive):
+            tasks.append(asyncio.create_task(budget("interactive", i)))
+            await asyncio.sleep(args.interval)
+        await asyncio.gather(*tasks)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(budget("batch", i) for i in range(args.jobs)), interactive_stream())
+    return results, failures, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=300, help="requests per minute allowed by the stub (and the scheduler)")
+    parser.add_argument("--jobs", type=int, default=90, help="background budget jobs submitted at once")
+    parser.add_argument("--interactive", type=int, default=20, help="interactive budget requests")
+    parser.add_argument("--interval", type=float, default=1.0, help="seconds between interactive requests")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub latency per answered call")
+    args = parser.parse_args()
+
+    calls = 4 * (args.jobs + args.interactive)
+    print(f"{args.jobs} jobs + {args.interactive} interactive requests ({calls} LLM calls), limit {args.rpm} RPM\n")
+    header = f"{'setup':<13}{'429s':>6}{'failed':>8}{'interactive p50/p95 s':>23}{'batch p50/p95 s':>17}{'wall s':>8}"
+    print(header)
+    print("-" * len(header))
+    setups = {
+        "unscheduled": lambda transport: client_class(ChatGroq, transport, max_retries=2),
+        "scheduled": lambda transport: client_class(langchain_pipeline.ScheduledChatGroq, transport),
+    }
+    for name, build in setups.items():
+        transport = RateLimitedGroqTransport(args.rpm, args.latency)
+        results, failures, wall = asyncio.run(run_setup(args, build(transport)))
+
+        def percentiles(latencies):
+            if len(latencies) < 2:
+                return "-"
+            return f"{statistics.median(latencies):.2f}/{statistics.quantiles(latencies, n=20)[-1]:.2f}"
+
+        print(
+            f"{name:<13}{transport.rejected:>6}{sum(failures.values()):>8}"
+            f"{percentiles(results['interactive']):>23}{percentiles(results['batch']):>17}{wall:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
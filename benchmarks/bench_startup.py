@@ -0,0 +1,107 @@
+"""
+Startup-time benchmark for the API module.
+
+Imports `main` in fresh interpreters (as a uvicorn worker does on start or respawn)
+and reports:
+  - wall time of `import main` (best of N runs)
+  - import time of the slowest packages (own time of all their modules), from `python -X importtime`
+  - whether any dependency that should load lazily was imported at startup
+
+Exits with a non-zero status if the import takes longer than --max-ms or a lazy
+dependency (LangChain/Groq, vosk, pandas, pyarrow) is imported eagerly.
+
+Usage:
+    python benchmarks/bench_startup.py --runs 5 --max-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Packages that must only be imported on first use
+LAZY_MODULES = ["langchain_pipeline", "langchain", "langchain_groq", "groq", "vosk", "pandas", "pyarrow"]
+
+TIMED_IMPORT = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - start\n"
+    "print(json.dumps({'seconds': elapsed, 'modules': sorted(sys.modules)}))\n"
+)
+
+
+def child_env():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = REPO_DIR + os.pathsep + env.get("PYTHONPATH", "")
+    # Never used: no request is made, but the modules read them at import time
+    env.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+    env.setdefault("DEEPGRAM_API_KEY", "benchmark-placeholder")
+    return env
+
+
+def timed_import(workdir):
+    """Imports main in a fresh interpreter; returns (seconds, imported module names)."""
+    result = subprocess.run(
+        [sys.executable, "-c", TIMED_IMPORT], cwd=workdir, env=child_env(),
+        capture_output=True, text=True, check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    return report["seconds"], report["modules"]
+
+
+def import_profile(workdir):
+    """Import time (microseconds) per top-level package: sum of the self time of its modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=workdir, env=child_env(),
+        capture_output=True, text=True, check=True,
+    )
+    totals = {}
+    for line in result.stderr.splitlines():
+        # "import time:  self [us] | cumulative | imported package"
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|")
+        package = name.strip().split(".")[0]
+        totals[package] = totals.get(package, 0) + int(own)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=10, help="slowest packages to list")
+    parser.add_argument("--max-ms", type=float, default=1500, help="fail if `import main` takes longer")
+    args = parser.parse_args()
+
+    failures = 0
+    # Importing main creates budgets/ and cache/ in the working directory: keep them out of the repo
+    with tempfile.TemporaryDirectory() as workdir:
+        timings = []
+        for _ in range(args.runs):
+            seconds, modules = timed_import(workdir)
+            timings.append(seconds)
+        profile = import_profile(workdir)
+
+    best = min(timings) * 1000
+    print(f"import main: best {best:.0f} ms, worst {max(timings) * 1000:.0f} ms over {args.runs} runs")
+
+    print(f"\n{'package':<28}{'ms':>10}")
+    for package, micros in sorted(profile.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{package:<28}{micros / 1000:>10.1f}")
+
+    eager = [name for name in LAZY_MODULES if name in modules]
+    if eager:
+        failures += 1
+        print(f"\nFAIL imported at startup, should be lazy: {', '.join(eager)}")
+    if best > args.max_ms:
+        failures += 1
+        print(f"\nFAIL import main took {best:.0f} ms (threshold {args.max_ms:.0f} ms)")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
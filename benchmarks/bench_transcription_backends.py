@@ -0,0 +1,174 @@
+"""
+Transcription backend benchmark: remote Deepgram vs offline Vosk (process pool).
+
+Transcribes a fixed audio corpus through each backend with N requests in flight and reports:
+  - latency per clip (p50 / p95 / max)
+  - throughput (clips/s) and real-time factor (seconds of audio decoded per wall second)
+  - event-loop lag: the longest a 10 ms ticker was delayed while the backend ran,
+    which shows whether decoding stays off the event loop
+
+The corpus is every .wav file in --corpus (16-bit mono PCM for Vosk). Without --corpus,
+a deterministic synthetic corpus is generated, which is enough to compare timing but not
+transcripts. Vosk needs VOSK_MODEL_PATH; Deepgram needs DEEPGRAM_API_KEY (or a stub
+server via --deepgram-url).
+
+Usage:
+    python benchmarks/bench_transcription_backends.py --corpus samples/ --concurrency 4
+    python benchmarks/bench_transcription_backends.py --backends vosk --clips 16 --seconds 10
+"""
+import argparse
+import asyncio
+import io
+import math
+import os
+import random
+import statistics
+import struct
+import sys
+import time
+import wave
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transcription import DEEPGRAM_BASE_URL, DeepgramTranscriber, TranscriptionError, VoskTranscriber
+
+
+def synthetic_clip(seconds, seed, rate=16000):
+    """Deterministic 16-bit mono WAV: tone bursts separated by low noise (speech-like on/off energy)."""
+    rng = random.Random(seed)
+    samples = []
+    for i in range(int(seconds * rate)):
+        t = i / rate
+        voiced = int(t * 2) % 3 != 2  # ~1 s of "speech", 0.5 s of pause
+        value = 0.3 * math.sin(2 * math.pi * (180 + 40 * seed % 5) * t) if voiced else 0.0
+        samples.append(int(32767 * max(-1.0, min(1.0, value + rng.uniform(-0.01, 0.01)))))
+
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return buffer.getvalue()
+
+
+def load_corpus(args):
+    """Returns [(name, wav bytes, duration in seconds)]."""
+    if args.corpus:
+        names = sorted(name for name in os.listdir(args.corpus) if name.lower().endswith(".wav"))
+        clips = []
+        for name in names:
+            with open(os.path.join(args.corpus, name), "rb") as f:
+                clips.append((name, f.read()))
+    else:
+        clips = [(f"synthetic_{i}.wav", synthetic_clip(args.seconds, i)) for i in range(args.clips)]
+
+    corpus = []
+    for name, audio_bytes in clips:
+        with wave.open(io.BytesIO(audio_bytes)) as wav:
+            corpus.append((name, audio_bytes, wav.getnframes() / wav.getframerate()))
+    return corpus
+
+
+async def measure_loop_lag(stop, interval=0.01):
+    """Longest delay of a periodic ticker beyond its interval, in seconds."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run_backend(transcriber, corpus, concurrency, rounds):
+    await transcriber.start()
+    try:
+        await transcriber.warmup()  # Model load / TLS handshake are startup costs, not per-request costs
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies, errors = [], 0
+
+        async def transcribe(audio_bytes):
+            nonlocal errors
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    await transcriber.transcribe(audio_bytes, "audio/wav")
+                except TranscriptionError as e:
+                    errors += 1
+                    print(f"  error: {e.detail}")
+                    return
+                latencies.append(time.perf_counter() - start)
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        start = time.perf_counter()
+        await asyncio.gather(*(transcribe(audio) for _ in range(rounds) for _, audio, _ in corpus))
+        wall = time.perf_counter() - start
+        stop.set()
+        loop_lag = await lag_task
+    finally:
+        await transcriber.aclose()
+
+    audio_seconds = rounds * sum(duration for _, _, duration in corpus)
+    return {
+        "clips": len(latencies),
+        "errors": errors,
+        "p50": statistics.median(latencies) if latencies else float("nan"),
+        "p95": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else float("nan"),
+        "max": max(latencies) if latencies else float("nan"),
+        "throughput": len(latencies) / wall,
+        "rtf": audio_seconds / wall if latencies else 0.0,
+        "loop_lag": loop_lag,
+    }
+
+
+def build_backends(args):
+    backends = {}
+    if "deepgram" in args.backends:
+        backends["deepgram"] = DeepgramTranscriber(base_url=args.deepgram_url)
+    if "vosk" in args.backends:
+        backends["vosk"] = VoskTranscriber(workers=args.workers)
+    return backends
+
+
+async def run(args):
+    corpus = load_corpus(args)
+    total = sum(duration for _, _, duration in corpus)
+    print(f"corpus: {len(corpus)} clips, {total:.1f} s of audio, concurrency {args.concurrency}, {args.rounds} round(s)\n")
+
+    header = f"{'backend':<10}{'clips':>6}{'errors':>8}{'p50 s':>8}{'p95 s':>8}{'max s':>8}{'clips/s':>9}{'audio s/s':>11}{'loop lag ms':>13}"
+    print(header)
+    print("-" * len(header))
+    for name, transcriber in build_backends(args).items():
+        config_error = transcriber.config_error()
+        if config_error is not None:
+            print(f"{name:<10}skipped: {config_error}")
+            continue
+        try:
+            r = await run_backend(transcriber, corpus, args.concurrency, args.rounds)
+        except TranscriptionError as e:
+            print(f"{name:<10}failed: {e.detail}")
+            continue
+        print(
+            f"{name:<10}{r['clips']:>6}{r['errors']:>8}{r['p50']:>8.2f}{r['p95']:>8.2f}{r['max']:>8.2f}"
+            f"{r['throughput']:>9.2f}{r['rtf']:>11.1f}{r['loop_lag'] * 1000:>13.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backends", nargs="+", choices=["deepgram", "vosk"], default=["deepgram", "vosk"])
+    parser.add_argument("--corpus", help="directory of .wav files (default: synthetic corpus)")
+    parser.add_argument("--clips", type=int, default=8, help="synthetic corpus size")
+    parser.add_argument("--seconds", type=float, default=15, help="length of each synthetic clip")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight")
+    parser.add_argument("--rounds", type=int, default=1, help="passes over the corpus")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Vosk decoder processes")
+    parser.add_argument("--deepgram-url", default=DEEPGRAM_BASE_URL, help="Deepgram base URL (or a local stub)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
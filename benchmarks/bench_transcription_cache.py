@@ -0,0 +1,98 @@
+"""
+Transcription cache benchmark: first upload vs re-upload of the same clip.
+
+Uploads each clip --repeats times to /transcribe_audio in-process, with Deepgram replaced by
+a stub transport that answers after --deepgram-seconds, and reports:
+  - latency of the first upload (miss: normalization + backend call) vs the re-uploads (hit)
+  - backend calls made (a hit never reaches Deepgram)
+  - cost of hashing the upload while it streams in (sha256 throughput)
+  - the cache counters exposed by /metrics
+
+Usage:
+    python benchmarks/bench_transcription_cache.py --clips 4 --repeats 3 --seconds 30 --backend tiered
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark-placeholder")  # Never sent anywhere: Deepgram is stubbed
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+os.environ.setdefault("WARMUP_ON_STARTUP", "0")
+
+import httpx
+
+
+class SlowDeepgramTransport(httpx.AsyncBaseTransport):
+    """Stands in for Deepgram: consumes the body, waits `latency` seconds, returns a fixed transcript."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    async def handle_async_request(self, request):
+        async for _ in request.stream:
+            pass
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return httpx.Response(200, json={"results": {"channels": [{"alternatives": [{"transcript": "ok"}]}]}})
+
+
+async def run(args, clips):
+    import main as api
+
+    stub = SlowDeepgramTransport(args.deepgram_seconds)
+    api.transcriber.client = httpx.AsyncClient(base_url="http://deepgram.stub", transport=stub)
+
+    misses, hits = [], []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench", timeout=None) as client:
+        for audio_bytes in clips:
+            for attempt in range(args.repeats):
+                start = time.perf_counter()
+                response = await client.post("/transcribe_audio", files={"file": ("clip.wav", audio_bytes, "audio/wav")})
+                response.raise_for_status()
+                (hits if attempt else misses).append(time.perf_counter() - start)
+        metrics = (await client.get("/metrics")).json()["cache"]["transcription"]
+
+    print(f"{'upload':<12}{'requests':>9}{'median s':>10}")
+    print(f"{'first':<12}{len(misses):>9}{statistics.median(misses):>10.3f}")
+    if hits:
+        print(f"{'re-upload':<12}{len(hits):>9}{statistics.median(hits):>10.3f}")
+    print(f"\nDeepgram calls: {stub.calls} for {len(misses) + len(hits)} uploads")
+    print(f"cache: {metrics}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clips", type=int, default=4, help="distinct clips")
+    parser.add_argument("--repeats", type=int, default=3, help="uploads of each clip")
+    parser.add_argument("--seconds", type=float, default=30, help="length of each clip")
+    parser.add_argument("--deepgram-seconds", type=float, default=1.0, help="stub backend latency")
+    parser.add_argument("--backend", choices=["memory", "sqlite", "tiered", "none"], default="memory")
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+    os.environ["TRANSCRIPTION_CACHE_BACKEND"] = args.backend
+    os.environ["TRANSCRIPTION_CACHE_PATH"] = os.path.join(cache_dir, "transcription_cache.sqlite3")
+    from bench_chunked_transcription import synthetic_recording  # Imports transcription: after the cache settings
+
+    clips = [synthetic_recording(args.seconds / 60, seed=i) for i in range(args.clips)]
+    start = time.perf_counter()
+    for audio_bytes in clips:
+        hashlib.sha256(audio_bytes).hexdigest()
+    hashing = time.perf_counter() - start
+    total = sum(len(audio_bytes) for audio_bytes in clips)
+    print(f"{args.clips} clips of {args.seconds:g} s ({total / args.clips / 1e6:.2f} MB each), {args.backend} cache")
+    print(f"sha256: {total / hashing / 1e6:.0f} MB/s ({hashing / args.clips * 1000:.2f} ms per clip)\n")
+
+    asyncio.run(run(args, clips))
+
+
+if __name__ == "__main__":
+    main()
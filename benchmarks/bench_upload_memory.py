@@ -0,0 +1,126 @@
+"""
+Upload memory benchmark for /transcribe_audio.
+
+Sends N concurrent uploads of a given size through the app in-process (httpx ASGI
+transport, Deepgram replaced by a stub transport that consumes the streamed body) and
+records peak Python heap usage with tracemalloc:
+  legacy    the previous handler: `await file.read()` then forward the bytes
+  streamed  the current handler: spooled upload, size limit, body streamed to the backend
+
+Also checks that an upload above MAX_UPLOAD_BYTES is rejected with 413.
+
+Usage:
+    python benchmarks/bench_upload_memory.py --size-mb 20 --concurrency 8
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DEEPGRAM_API_KEY", "benchmark-placeholder")  # Never sent anywhere: Deepgram is stubbed
+os.environ.setdefault("GROQ_API_KEY", "benchmark-placeholder")
+
+import httpx
+from fastapi import FastAPI, File, UploadFile
+
+
+class StubDeepgramTransport(httpx.AsyncBaseTransport):
+    """Stands in for Deepgram: consumes the request body chunk by chunk and returns a fixed transcript."""
+
+    def __init__(self):
+        self.received = 0
+
+    async def handle_async_request(self, request):
+        async for chunk in request.stream:
+            self.received += len(chunk)
+        return httpx.Response(200, json={"results": {"channels": [{"alternatives": [{"transcript": "ok"}]}]}})
+
+
+def legacy_app(transcriber):
+    """The handler before spooled uploads: the whole file is read into memory, then forwarded."""
+    app = FastAPI()
+
+    @app.post("/transcribe_audio")
+    async def transcribe_audio(file: UploadFile = File(...)):
+        audio_bytes = await file.read()
+        return {"transcription": await transcriber.transcribe(audio_bytes, file.content_type)}
+
+    return app
+
+
+async def upload_concurrently(app, path, concurrency):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=None) as client:
+
+        async def upload():
+            with open(path, "rb") as f:
+                response = await client.post("/transcribe_audio", files={"file": ("clip.wav", f, "audio/wav")})
+            return response.status_code
+
+        return await asyncio.gather(*(upload() for _ in range(concurrency)))
+
+
+async def measure(app, path, concurrency):
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+    start = time.perf_counter()
+    statuses = await upload_concurrently(app, path, concurrency)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] - baseline
+    return statuses, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=float, default=20, help="size of each upload")
+    parser.add_argument("--concurrency", type=int, default=8, help="uploads in flight")
+    args = parser.parse_args()
+
+    # The limit applies to the request body: the uploads (plus multipart framing) pass, one byte more is rejected
+    size = int(args.size_mb * 1024 * 1024)
+    limit = size + 64 * 1024
+    os.environ["MAX_UPLOAD_BYTES"] = str(limit)
+    import main as api
+    from uploads import MAX_UPLOAD_BYTES
+
+    stub = StubDeepgramTransport()
+    api.transcriber.client = httpx.AsyncClient(base_url="http://deepgram.stub", transport=stub)
+
+    with tempfile.NamedTemporaryFile(suffix=".wav") as f:
+        block = os.urandom(1024 * 1024)  # Not valid audio: the stub does not decode it
+        for offset in range(0, size, len(block)):
+            f.write(block[: size - offset])
+        f.flush()
+
+        tracemalloc.start()
+        print(f"{args.concurrency} concurrent uploads of {args.size_mb:.0f} MB\n")
+        print(f"{'handler':<10}{'status':>8}{'peak MB':>10}{'per upload MB':>15}{'seconds':>9}")
+        for name, app in (("legacy", legacy_app(api.transcriber)), ("streamed", api.app)):
+            statuses, peak, elapsed = asyncio.run(measure(app, f.name, args.concurrency))
+            status = statuses[0] if len(set(statuses)) == 1 else "mixed"
+            print(f"{name:<10}{status:>8}{peak / 1e6:>10.1f}{peak / 1e6 / args.concurrency:>15.2f}{elapsed:>9.2f}")
+        tracemalloc.stop()
+
+    # One byte over the limit: rejected up front when Content-Length announces it, and while streaming otherwise
+    async def send_oversized(announce_length):
+        async def body():
+            for offset in range(0, limit + 1, 1024 * 1024):
+                yield b"\0" * min(1024 * 1024, limit + 1 - offset)
+
+        headers = {"Content-Type": "audio/wav"}
+        if announce_length:
+            headers["Content-Length"] = str(limit + 1)
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=api.app), base_url="http://bench") as client:
+            response = await client.post("/transcribe_audio", content=body(), headers=headers)
+            return response.status_code
+
+    results = {"content-length": asyncio.run(send_oversized(True)), "streamed": asyncio.run(send_oversized(False))}
+    print(f"\noversized upload (limit {MAX_UPLOAD_BYTES} bytes): {results}")
+    sys.exit(0 if set(results.values()) == {413} else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Compares the two budget extraction modes against the real Groq API.
+
+  parallel  four calls (income, expenses, concerns, advice), each re-sending the input
+  single    one call returning a single JSON document with all four sections
+
+For every sample prompt and mode it records token usage (from the response usage
+metadata), wall-clock latency and whether the response could be parsed into a budget.
+Requires GROQ_API_KEY.
+
+Usage:
+    python benchmarks/compare_extraction_modes.py --rounds 3
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain.schema.runnable import RunnableParallel
+
+import langchain_pipeline
+
+SAMPLE_PROMPTS = [
+    "I earn $5000 a month and spend $1500 on rent, $400 on groceries and $120 on utilities.",
+    "My salary is 3200 dollars. I also make about 600 from freelancing. Rent is 1100, car payment 350, "
+    "insurance 180 and I spend around 300 eating out. I want to pay off my credit card.",
+    "I get $2,400 every month from my job and $300 in child support. Expenses: daycare $800, rent $950, "
+    "phone $60, gas $150. I'm worried I have no emergency savings.",
+    "Monthly income: 7800. Mortgage 2100, student loans 450, groceries 600, subscriptions 45, gym 40, "
+    "travel fund 300. I'd like to retire early and start investing.",
+]
+
+
+def token_usage(messages):
+    """Sums input/output tokens reported by the model across a list of responses."""
+    totals = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for message in messages:
+        usage = getattr(message, "usage_metadata", None) or {}
+        for key in totals:
+            totals[key] += usage.get(key, 0)
+    return totals
+
+
+def run_parallel(user_input):
+    # The raw chains, not budget_parallel_chain: its memoized branches would answer later rounds from cache
+    chain = RunnableParallel(
+        income=langchain_pipeline.income_chain,
+        expenses=langchain_pipeline.expenses_chain,
+        concerns=langchain_pipeline.concerns_chain,
+        advice=langchain_pipeline.advice_chain,
+    )
+    extracted_data = chain.invoke({"input": user_input})
+    budget = langchain_pipeline.budget_from_parallel(extracted_data)
+    return budget, token_usage(extracted_data.values())
+
+
+def run_single(user_input):
+    message = langchain_pipeline.budget_single_chain.invoke({"input": user_input})
+    budget = langchain_pipeline.budget_from_single(message)
+    return budget, token_usage([message])
+
+
+MODES = {"parallel": run_parallel, "single": run_single}
+
+
+def measure(mode, rounds):
+    latencies, failures, errors = [], 0, 0
+    tokens = {"input_tokens": 0, "output_tokens": 0, "total_tokens": 0}
+    for _ in range(rounds):
+        for user_input in SAMPLE_PROMPTS:
+            start = time.perf_counter()
+            try:
+                budget, usage = MODES[mode](user_input)
+            except Exception as e:  # Rate limits, timeouts: count separately from parse failures
+                print(f"  {mode}: request failed: {e}")
+                errors += 1
+                continue
+            latencies.append(time.perf_counter() - start)
+            failures += "error" in budget
+            for key in tokens:
+                tokens[key] += usage[key]
+
+    completed = len(latencies) or 1
+    return {
+        "requests": rounds * len(SAMPLE_PROMPTS),
+        "errors": errors,
+        "parse_failure_rate": failures / completed,
+        "avg_input_tokens": tokens["input_tokens"] / completed,
+        "avg_output_tokens": tokens["output_tokens"] / completed,
+        "avg_total_tokens": tokens["total_tokens"] / completed,
+        "p50_latency": statistics.median(latencies) if latencies else float("nan"),
+        "max_latency": max(latencies) if latencies else float("nan"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="how many times to run every sample prompt")
+    parser.add_argument("--modes", nargs="+", choices=sorted(MODES), default=["parallel", "single"])
+    args = parser.parse_args()
+
+    langchain_pipeline.init_llm()
+    results = {mode: measure(mode, args.rounds) for mode in args.modes}
+
+    header = f"{'mode':<10}{'reqs':>6}{'errors':>8}{'parse fail':>12}{'in tok':>9}{'out tok':>9}{'total tok':>11}{'p50 s':>8}{'max s':>8}"
+    print(header)
+    print("-" * len(header))
+    for mode, r in results.items():
+        print(
+            f"{mode:<10}{r['requests']:>6}{r['errors']:>8}{r['parse_failure_rate']:>11.1%} "
+            f"{r['avg_input_tokens']:>8.0f} {r['avg_output_tokens']:>8.0f} {r['avg_total_tokens']:>10.0f} "
+            f"{r['p50_latency']:>7.2f} {r['max_latency']:>7.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
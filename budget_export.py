@@ -0,0 +1,284 @@
+import asyncio
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from xml.sax.saxutils import escape
+
+# Excel generation runs off the event loop: "thread" (default) or "process" pool
+EXPORT_EXECUTOR = os.getenv("EXPORT_EXECUTOR", "thread")
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", "2"))
+
+# How many rows are encoded before a chunk is handed to the response
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "1000"))
+
+# Bump when any export's bytes change for the same data (part of download ETags)
+EXPORT_VERSION = "1"
+
+_executor = None
+
+
+class ExportUnavailableError(Exception):
+    """Raised when an export format needs an optional dependency that is not installed."""
+
+
+def budget_columns(budget_data):
+    """Columns: category & amount first, then any extra keys the expenses carry."""
+    columns = ["category", "amount"]
+    for item in budget_data["expenses"]:
+        for key in item:
+            if key not in columns:
+                columns.append(key)
+    return columns
+
+
+def budget_rows(budget_data):
+    """
+    Yields the spreadsheet rows of a budget: a header, the income row, one row per
+    expense and the recommended savings row (same layout as the old pandas export).
+    """
+    columns = budget_columns(budget_data)
+    padding = [None] * (len(columns) - 2)
+
+    yield columns
+    yield ["Income", budget_data["income"], *padding]
+    for item in budget_data["expenses"]:
+        yield [item.get(column) for column in columns]
+    yield ["Recommended Savings", budget_data["savings"], *padding]
+
+
+def _batches(budget_data, size=EXPORT_CHUNK_ROWS):
+    """Yields (columns, rows) batches of the data rows (header excluded)."""
+    rows = budget_rows(budget_data)
+    columns = next(rows)
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield columns, batch
+            batch = []
+    if batch:
+        yield columns, batch
+
+
+# =========================== CSV / NDJSON =========================== #
+
+def iter_budget_csv(budget_data):
+    """Streams the budget as UTF-8 CSV chunks."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(budget_columns(budget_data))
+    for _, rows in _batches(budget_data):
+        writer.writerows(rows)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def iter_budget_ndjson(budget_data):
+    """Streams the budget as newline-delimited JSON, one object per row."""
+    for columns, rows in _batches(budget_data):
+        yield "".join(json.dumps(dict(zip(columns, row))) + "\n" for row in rows).encode("utf-8")
+
+
+# =========================== Parquet =========================== #
+
+def iter_budget_parquet(budget_data):
+    """Streams the budget as a Parquet file built in memory (requires the optional pyarrow package)."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportUnavailableError("Parquet export requires the pyarrow package.")
+
+    rows = budget_rows(budget_data)
+    columns = next(rows)
+    records = [dict(zip(columns, row)) for row in rows]
+    try:
+        table = pa.Table.from_pylist(records)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed value types in a column: fall back to text columns
+        table = pa.Table.from_pylist([{k: None if v is None else str(v) for k, v in r.items()} for r in records])
+
+    sink = pa.BufferOutputStream()
+    pq.write_table(table, sink)
+    buffer = memoryview(sink.getvalue())
+
+    def chunks(size=64 * 1024):
+        for start in range(0, len(buffer), size):
+            yield bytes(buffer[start:start + size])
+
+    return chunks()
+
+
+# =========================== XLSX =========================== #
+
+# Characters that are not allowed in XML 1.0 text
+_INVALID_XML = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+_XLSX_STATIC_PARTS = {
+    "[Content_Types].xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        "</Types>"
+    ),
+    "_rels/.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/>'
+        "</Relationships>"
+    ),
+    "xl/workbook.xml": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>'
+        "</workbook>"
+    ),
+    "xl/_rels/workbook.xml.rels": (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        "</Relationships>"
+    ),
+}
+
+
+def _zip_entry(name):
+    """Zip entry with a fixed timestamp, so the same budget always produces byte-identical workbooks."""
+    info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED
+    return info
+
+
+def _column_letter(index):
+    """0 -> A, 25 -> Z, 26 -> AA, ..."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _xlsx_row(number, values, letters):
+    cells = []
+    for letter, value in zip(letters, values):
+        ref = f"{letter}{number}"
+        if value is None:
+            continue
+        if isinstance(value, bool):
+            cells.append(f'<c r="{ref}" t="b"><v>{int(value)}</v></c>')
+        elif isinstance(value, (int, float)):
+            cells.append(f'<c r="{ref}"><v>{value!r}</v></c>')
+        else:
+            text = escape(_INVALID_XML.sub("", str(value)))
+            cells.append(f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+    return f'<row r="{number}">{"".join(cells)}</row>'
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable file object that collects what zipfile writes, so it can be yielded."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_budget_xlsx(budget_data):
+    """
+    Streams the budget as an .xlsx workbook: the zip container and sheet XML are
+    generated on the fly, without a temp file (openpyxl always spools sheets to disk).
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in _XLSX_STATIC_PARTS.items():
+            workbook.writestr(_zip_entry(name), content)
+
+        with workbook.open(_zip_entry("xl/worksheets/sheet1.xml"), "w") as sheet:
+            columns = budget_columns(budget_data)
+            letters = [_column_letter(i) for i in range(len(columns))]
+            sheet.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            sheet.write(_xlsx_row(1, columns, letters).encode("utf-8"))
+            number = 2
+            for _, rows in _batches(budget_data):
+                sheet.write("".join(_xlsx_row(number + i, row, letters) for i, row in enumerate(rows)).encode("utf-8"))
+                number += len(rows)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+            sheet.write(b"</sheetData></worksheet>")
+    yield sink.drain()
+
+
+def write_budget_xlsx(budget_data, file_path):
+    """Writes the budget workbook to disk with the streaming xlsx writer."""
+    with open(file_path, "wb") as f:
+        for chunk in iter_budget_xlsx(budget_data):
+            f.write(chunk)
+
+
+# Export format -> (media type, chunk generator)
+EXPORT_FORMATS = {
+    "csv": ("text/csv", iter_budget_csv),
+    "ndjson": ("application/x-ndjson", iter_budget_ndjson),
+    "parquet": ("application/vnd.apache.parquet", iter_budget_parquet),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", iter_budget_xlsx),
+}
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        if EXPORT_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(
+                max_workers=EXPORT_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),  # Don't fork a process running an event loop and threads
+            )
+        else:
+            _executor = ThreadPoolExecutor(max_workers=EXPORT_WORKERS, thread_name_prefix="budget-export")
+    return _executor
+
+
+async def run_export(fn, *args):
+    """Runs an export/render function in the export pool so the event loop stays free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), fn, *args)
+
+
+def shutdown_export_executor():
+    """Stops the export pool. Called from the app lifespan on shutdown."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
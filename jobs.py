@@ -0,0 +1,217 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+# Background job settings
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "memory")  # "memory" or "sqlite" (shared across workers)
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", "cache/jobs.sqlite3")
+JOB_TTL_SECONDS = float(os.getenv("JOB_TTL_SECONDS", "86400"))  # How long finished jobs can be polled
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at capacity."""
+
+
+class InMemoryJobStore:
+    """Keeps job status and results in this process."""
+
+    def __init__(self, ttl_seconds=JOB_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def create(self, job_id):
+        now = time.time()
+        with self._lock:
+            # Forget finished jobs nobody polled within the TTL
+            expired = [
+                key for key, job in self._jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] + self.ttl_seconds < now
+            ]
+            for key in expired:
+                del self._jobs[key]
+
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "created_at": now,
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+
+    def update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+
+class SQLiteJobStore:
+    """Keeps job status and results in SQLite so any uvicorn worker can answer a poll."""
+
+    COLUMNS = ("id", "status", "created_at", "started_at", "finished_at", "result", "error")
+
+    def __init__(self, path, ttl_seconds=JOB_TTL_SECONDS):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, status TEXT NOT NULL, created_at REAL NOT NULL, "
+            "started_at REAL, finished_at REAL, result TEXT, error TEXT)"
+        )
+        self._conn.commit()
+
+    def create(self, job_id):
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.ttl_seconds,))
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, created_at) VALUES (?, 'queued', ?)", (job_id, now)
+            )
+            self._conn.commit()
+
+    def update(self, job_id, **fields):
+        if "result" in fields:
+            fields["result"] = json.dumps(fields["result"])
+        assignments = ", ".join(f"{column} = ?" for column in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            self._conn.commit()
+
+    def get(self, job_id):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(self.COLUMNS, row))
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        return job
+
+
+def create_job_store(backend=JOB_STORE_BACKEND, path=JOB_STORE_PATH):
+    """Builds the job store selected by configuration ("memory" or "sqlite")."""
+    if backend == "sqlite":
+        return SQLiteJobStore(path)
+    if backend == "memory":
+        return InMemoryJobStore()
+    raise ValueError(f"Unknown job store backend: {backend}")
+
+
+class _Timing:
+    """Running count / average / max of a duration, for metrics."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "avg_seconds": self.total / self.count if self.count else 0.0,
+            "max_seconds": self.max,
+        }
+
+
+class JobManager:
+    """Runs submitted jobs on a bounded pool of asyncio workers fed by a bounded queue."""
+
+    def __init__(self, runner, store, workers=JOB_WORKERS, queue_size=JOB_QUEUE_SIZE):
+        self.runner = runner  # async callable: payload -> JSON-serializable result
+        self.store = store
+        self.workers = workers
+        self.queue_size = queue_size
+        self._queue = None
+        self._tasks = []
+        self.submitted = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_time = _Timing()
+        self.run_time = _Timing()
+
+    async def start(self):
+        """Starts the worker tasks. Called from the app lifespan."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancels the worker tasks. Called from the app lifespan on shutdown."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload):
+        """Queues a job and returns its id right away."""
+        if self._queue.full():
+            self.rejected += 1
+            raise QueueFullError("Too many queued jobs, try again later.")
+
+        job_id = uuid.uuid4().hex
+        self.store.create(job_id)
+        self._queue.put_nowait((job_id, payload, time.monotonic()))
+        self.submitted += 1
+        return job_id
+
+    def get(self, job_id):
+        return self.store.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id, payload, enqueued_at = await self._queue.get()
+            started_at = time.monotonic()
+            self.wait_time.add(started_at - enqueued_at)
+            self.store.update(job_id, status="running", started_at=time.time())
+
+            try:
+                result = await self.runner(payload)
+            except Exception as e:
+                print(f"Job {job_id} failed: {e}")
+                result = {"error": "Budget generation failed."}
+
+            self.run_time.add(time.monotonic() - started_at)
+            if "error" in result:
+                self.failed += 1
+                self.store.update(job_id, status="failed", error=result["error"], finished_at=time.time())
+            else:
+                self.succeeded += 1
+                self.store.update(job_id, status="succeeded", result=result, finished_at=time.time())
+            self._queue.task_done()
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+            "submitted": self.submitted,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "wait_time": self.wait_time.stats(),
+            "run_time": self.run_time.stats(),
+        }
@@ -0,0 +1,152 @@
+import json
+import re
+
+# Closing bracket expected for each opening bracket
+_CLOSERS = {"{": "}", "[": "]"}
+
+# Characters that matter in each scanner state; everything else is skipped with one regex search
+_OPENERS = re.compile(r"[\[{]")
+_STRUCTURAL = re.compile(r'[\[\]{}"]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+
+# How many times finish() rescans after an unclosed candidate (keeps the worst case linear)
+_MAX_RESTARTS = 8
+
+
+class JSONScanner:
+    """
+    Finds the first complete JSON object or array in text that may be wrapped in prose.
+
+    Text can be fed in one piece or as streamed chunks. The scanner tracks bracket
+    nesting and string/escape state in a single forward pass, so every character is
+    examined once. When a balanced candidate does not parse (e.g. `{note}` in prose),
+    or a closing bracket does not match, scanning resumes after that candidate
+    instead of backtracking into it. That keeps the worst case linear in the input
+    size, at the cost of not finding JSON nested inside a non-JSON bracketed span.
+
+    A bracket in prose that never closes is only known to be one at the end of the
+    input, and a quote after it (`He said "hi {" then [1]`) puts the scanner in a
+    string that swallows the JSON that follows. So call finish() once the text is
+    complete: it rescans from the next opening bracket, at most _MAX_RESTARTS times.
+    """
+
+    def __init__(self):
+        self._parts = []  # Chunks of the current, still unbalanced candidate
+        self._stack = []  # Expected closing brackets of the current candidate
+        self._in_string = False
+        self._escape = False  # A backslash ended the previous chunk inside a string
+        self._saw_string = False  # The current candidate contains a string
+        self.done = False
+        self.value = None
+
+    def feed(self, chunk):
+        """Scans the next chunk of text. Returns the parsed value once one is complete, otherwise None."""
+        if self.done:
+            return self.value
+
+        pos, end = 0, len(chunk)
+        start = 0 if self._stack else None  # Where the current candidate begins in this chunk
+
+        while pos < end:
+            if not self._stack:
+                match = _OPENERS.search(chunk, pos)
+                if match is None:
+                    break
+                start, pos = match.start(), match.end()
+                self._stack.append(_CLOSERS[match.group()])
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    pos += 1
+                    self._escape = False
+                    continue
+                match = _STRING_SPECIAL.search(chunk, pos)
+                if match is None:
+                    pos = end
+                elif match.group() == "\\":
+                    pos = match.end() + 1
+                    self._escape = pos > end  # The escaped character is in the next chunk
+                else:
+                    pos = match.end()
+                    self._in_string = False
+                continue
+
+            match = _STRUCTURAL.search(chunk, pos)
+            if match is None:
+                pos = end
+                break
+            char, pos = match.group(), match.end()
+
+            if char == '"':
+                self._in_string = self._saw_string = True
+            elif char in _CLOSERS:
+                self._stack.append(_CLOSERS[char])
+            elif char != self._stack[-1]:
+                # Mismatched bracket: this span is not JSON, continue after it
+                self._reset()
+                start = None
+            else:
+                self._stack.pop()
+                if not self._stack:
+                    candidate = "".join(self._parts) + chunk[start:pos]
+                    self._parts = []
+                    self._saw_string = False
+                    start = None
+                    try:
+                        self.value = json.loads(candidate)
+                    except (json.JSONDecodeError, RecursionError):
+                        continue  # Balanced but not JSON (or nested too deeply): look for the next candidate
+                    self.done = True
+                    return self.value
+
+        # Keep the unfinished candidate for the next chunk
+        if self._stack:
+            self._parts.append(chunk[start:])
+        return None
+
+    def finish(self):
+        """
+        Signals the end of the input. If a candidate is still open, its opening bracket was
+        prose; when a string started after it, that string may have swallowed the JSON that
+        follows, so the text is scanned again from the next opening bracket (without a string,
+        the rest was already scanned as structure). Returns the value or None.
+        """
+        scanner = self
+        for _ in range(_MAX_RESTARTS):
+            if scanner.done or not scanner._stack or not scanner._saw_string:
+                break
+            rest = "".join(scanner._parts)[1:]  # Everything after the unclosed opening bracket
+            scanner = JSONScanner()
+            scanner.feed(rest)
+        self.done, self.value = scanner.done, scanner.value
+        self._reset()
+        return self.value
+
+    def _reset(self):
+        self._parts = []
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._saw_string = False
+
+
+_decoder = json.JSONDecoder()
+
+
+def find_first_json(text):
+    """Returns the first complete JSON object/array embedded in text, or None if there is none."""
+
+    # Common case: prose followed by valid JSON. One C-speed attempt at the first bracket,
+    # then fall back to the scanner (a single attempt keeps the whole call linear).
+    match = _OPENERS.search(text)
+    if match is None:
+        return None
+    try:
+        return _decoder.raw_decode(text, match.start())[0]
+    except (json.JSONDecodeError, RecursionError):
+        pass
+
+    scanner = JSONScanner()
+    scanner.feed(text)
+    return scanner.finish()
@@ -1,20 +1,71 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
 import json
-import re
+import os
+import threading
+import time
+from collections import deque
+import httpx
 from dotenv import load_dotenv
+from groq import APIConnectionError, InternalServerError, RateLimitError
 from langchain_groq import ChatGroq
 from langchain.prompts import ChatPromptTemplate, PromptTemplate
-from langchain.schema.runnable import RunnableParallel
+from langchain.schema.runnable import RunnableLambda, RunnableParallel
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from budget_cache import create_cache, make_cache_key, normalize_text
+from json_scanner import find_first_json
 
 # Load environment variables (API keys)
 load_dotenv()
 
-# Initialize AI model (Groq Llama3)
-llm = ChatGroq(
-    model="llama3-8b-8192",
-    temperature=0.1,  # More deterministic output
-    max_tokens=None,  
-    max_retries=2  
-)
+# Extraction mode: "parallel" fans out four LLM calls, "single" asks for one JSON document
+BUDGET_PIPELINE_MODE = os.getenv("BUDGET_PIPELINE_MODE", "parallel")
+
+# Voice-to-budget: income & expenses are extracted from each window of at least this many
+# transcript characters while the rest of the recording is still being transcribed
+BUDGET_SEGMENT_MIN_CHARS = int(os.getenv("BUDGET_SEGMENT_MIN_CHARS", "400"))
+# Each window is twice the size of the one before, up to BUDGET_SEGMENT_MAX_CHARS, and windows after the
+# first are sent with at most BUDGET_SEGMENT_CONTEXT_CHARS of the transcript before them: prompt tokens
+# grow linearly with the recording, with few windows for a long note
+BUDGET_SEGMENT_MAX_CHARS = int(os.getenv("BUDGET_SEGMENT_MAX_CHARS", "3200"))
+BUDGET_SEGMENT_CONTEXT_CHARS = int(os.getenv("BUDGET_SEGMENT_CONTEXT_CHARS", "400"))
+
+# Bump whenever a prompt changes so cached budgets from the old prompts are no longer served
+PROMPT_VERSION = "1"
+
+# Budget result cache: "memory" (per-process LRU), "sqlite" (shared across workers) or "none"
+BUDGET_CACHE_BACKEND = os.getenv("BUDGET_CACHE_BACKEND", "memory")
+BUDGET_CACHE_MAX_ENTRIES = int(os.getenv("BUDGET_CACHE_MAX_ENTRIES", "1024"))
+BUDGET_CACHE_TTL_SECONDS = float(os.getenv("BUDGET_CACHE_TTL_SECONDS", "86400"))
+BUDGET_CACHE_PATH = os.getenv("BUDGET_CACHE_PATH", "cache/budget_cache.sqlite3")
+
+# Per-branch memoization of the income/expenses/concerns/advice chains
+BRANCH_CACHE_BACKEND = os.getenv("BRANCH_CACHE_BACKEND", "memory")
+BRANCH_CACHE_MAX_ENTRIES = int(os.getenv("BRANCH_CACHE_MAX_ENTRIES", "4096"))
+BRANCH_CACHE_TTL_SECONDS = float(os.getenv("BRANCH_CACHE_TTL_SECONDS", "86400"))
+BRANCH_CACHE_DIR = os.getenv("BRANCH_CACHE_DIR", "cache")
+
+# AI model (Groq Llama3) and connection settings (override the base URL to point tests/benchmarks at a local stub)
+LLM_MODEL = "llama3-8b-8192"
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "20"))
+GROQ_MAX_KEEPALIVE = int(os.getenv("GROQ_MAX_KEEPALIVE", "10"))
+GROQ_KEEPALIVE_EXPIRY = float(os.getenv("GROQ_KEEPALIVE_EXPIRY", "30"))
+
+# Client-side Groq rate limits (set them to your account's limits, 0 disables one): every LLM call
+# waits in the scheduler until both budgets allow it, so bursts queue up instead of hitting 429s
+GROQ_RPM_LIMIT = int(os.getenv("GROQ_RPM_LIMIT", "30"))
+GROQ_TPM_LIMIT = int(os.getenv("GROQ_TPM_LIMIT", "30000"))
+GROQ_EXPECTED_OUTPUT_TOKENS = int(os.getenv("GROQ_EXPECTED_OUTPUT_TOKENS", "400"))  # Reserved until the real usage is known
+GROQ_MAX_RETRIES = int(os.getenv("GROQ_MAX_RETRIES", "2"))  # Retries go back through the scheduler
+
+# The Groq client and every chain that calls it are built by init_llm() (from the app lifespan),
+# so importing this module needs no API key and opens no connection
+llm = None
+llm_http_client = None  # Keep-alive connection pool shared by all async LLM calls
+_llm_lock = threading.Lock()
 
 # Function to clean AI response & extract JSON
 def extract_json(text):
@@ -23,14 +74,11 @@ def extract_json(text):
         # Directly parse if already valid JSON
         parsed_data = json.loads(text)
         return parsed_data  # Return parsed JSON directly
-    except json.JSONDecodeError:
-        # Handle cases where AI wraps JSON in extra text
-        match = re.search(r"(\{.*\}|\[.*\])", text, re.DOTALL)
-        if match:
-            try:
-                return json.loads(match.group())  # Extract and parse valid JSON
-            except json.JSONDecodeError:
-                pass  # Continue to final error return
+    except (json.JSONDecodeError, RecursionError):
+        # Handle cases where AI wraps JSON in extra text: take the first complete JSON value
+        parsed_data = find_first_json(text)
+        if parsed_data is not None:
+            return parsed_data
 
     return {"error": "Invalid JSON format from AI.", "raw_response": text}
 
@@ -46,7 +94,7 @@ csv_prompt = ChatPromptTemplate.from_messages([
 ])
 
 # AI Prompt for Financial Advice
-advice_prompt = PromptTemplate(
+planner_advice_prompt = PromptTemplate(
     template="""Based on this situation: {user_input},  
         provide clear, actionable financial advice.  
         - Budgeting  
@@ -57,14 +105,15 @@ advice_prompt = PromptTemplate(
     input_variables=["user_input"],
 )
 
-# Chain for parallel execution of CSV & Advice
-csv_advice_chain = RunnableParallel(csv=csv_prompt | llm, advice=advice_prompt | llm)
+# Chain for parallel execution of CSV & Advice (built by init_llm)
+csv_advice_chain = None
 
 # Function to run AI-generated budget & advice
 def financial_planner(user_input: str):
     if not user_input.strip():
         return {"error": "Please provide financial details."}
 
+    init_llm()
     result = csv_advice_chain.invoke({"user_input": user_input})
     return result["csv"].content, result["advice"].content
 
@@ -90,20 +139,475 @@ advice_prompt = PromptTemplate.from_template(
     "Based on this situation: {input}, provide actionable financial advice."
 )
 
-# Chains for processing income, expenses, concerns, and advice
-income_chain = income_prompt | llm
-expenses_chain = expenses_prompt | llm
-concerns_chain = concerns_prompt | llm
-advice_chain = advice_prompt | llm
-
-# Optimized Parallel Execution Chain
-budget_parallel_chain = RunnableParallel(
-    income=income_chain,
-    expenses=expenses_chain,
-    concerns=concerns_chain,
-    advice=advice_chain,
+# Voice-to-budget windows after the first: the model sees the end of the transcript before the window
+# and reports only what the new part adds, so an amount that is repeated right away is not extracted twice
+income_window_prompt = PromptTemplate.from_template(
+    "Earlier in this recording: {context}\n"
+    "New part: {input}\n"
+    "Extract ONLY income sources first mentioned in the new part, or whose amount the new part corrects "
+    "(use the same source name). Do not repeat income from the earlier part.\n"
+    "Respond ONLY in JSON: [{{\"source\": \"...\", \"amount\": ...}}]"
+)
+
+expenses_window_prompt = PromptTemplate.from_template(
+    "Earlier in this recording: {context}\n"
+    "New part: {input}\n"
+    "Extract ONLY expenses first mentioned in the new part, or whose amount the new part corrects "
+    "(use the same category). Do not repeat expenses from the earlier part.\n"
+    "Respond ONLY in JSON: [{{\"category\": \"...\", \"amount\": ...}}]"
+)
+
+# Chains for processing income, expenses, concerns, and advice (prompt | llm, built by init_llm)
+income_chain = expenses_chain = concerns_chain = advice_chain = None
+income_window_chain = expenses_window_chain = None
+
+# =========================== Branch Memoization =========================== #
+
+# One cache per branch, so a retry only pays for the branches that are actually missing
+branch_caches = {
+    name: create_cache(
+        BRANCH_CACHE_BACKEND,
+        max_entries=BRANCH_CACHE_MAX_ENTRIES,
+        ttl_seconds=BRANCH_CACHE_TTL_SECONDS,
+        path=os.path.join(BRANCH_CACHE_DIR, f"branch_{name}.sqlite3"),
+        dumps=lambda message: json.dumps(message_to_dict(message)),
+        loads=lambda payload: messages_from_dict([json.loads(payload)])[0],
+    )
+    for name in ("income", "expenses", "concerns", "advice")
+}
+
+
+def _has_valid_json(message):
+    """Only JSON branch responses that parse are worth memoizing."""
+    parsed_data = extract_json(message.content)
+    return not (isinstance(parsed_data, dict) and "error" in parsed_data)
+
+
+def branch_cache_key(name, user_input):
+    """Cache key of one branch: model name + prompt version + branch name + normalized input."""
+    return make_cache_key(LLM_MODEL, PROMPT_VERSION, name, normalize_text(user_input))
+
+
+def memoize_branch(name, chain, validate=None):
+    """Wraps a branch chain so its response is served from branch_caches[name] when available."""
+    cache = branch_caches[name]
+
+    def cache_key(inputs):
+        return branch_cache_key(name, inputs["input"])
+
+    def store(key, message):
+        if validate is None or validate(message):
+            cache.set(key, message)
+
+    def invoke(inputs, config):
+        key = cache_key(inputs)
+        message = cache.get(key)
+        if message is None:
+            message = chain.invoke(inputs, config)
+            store(key, message)
+        return message
+
+    async def ainvoke(inputs, config):
+        key = cache_key(inputs)
+        message = cache.get(key)
+        if message is None:
+            message = await chain.ainvoke(inputs, config)
+            store(key, message)
+        return message
+
+    return RunnableLambda(invoke, afunc=ainvoke, name=f"{name}_branch")
+
+
+# Memoized branches and the parallel chains over them (built by init_llm):
+#  - budget_parallel_chain runs all four branches
+#  - form_parallel_chain runs concerns & advice only: form requests already carry structured income & expenses
+income_branch = expenses_branch = concerns_branch = advice_branch = None
+budget_parallel_chain = form_parallel_chain = None
+
+# =========================== Single-Call Structured Extraction =========================== #
+
+# One prompt that returns income, expenses, concerns and advice in a single JSON document
+budget_json_prompt = PromptTemplate.from_template(
+    "From this input: {input}, analyze the user's finances.\n"
+    "Respond ONLY in JSON with exactly these keys:\n"
+    "{{\"income\": [{{\"source\": \"...\", \"amount\": ...}}], "
+    "\"expenses\": [{{\"category\": \"...\", \"amount\": ...}}], "
+    "\"concerns\": \"financial concerns and goals\", "
+    "\"advice\": \"actionable financial advice\"}}"
 )
 
+budget_single_chain = None  # budget_json_prompt | llm, built by init_llm
+
+
+# =========================== LLM Request Scheduler =========================== #
+
+# Scheduling order: interactive requests before background jobs, and within each, extraction
+# before the long advice generation. Jobs set llm_request_class; advice chains use a model whose llm_stage is "advice"
+REQUEST_CLASSES = {"interactive": 0, "batch": 1}
+LLM_STAGES = {"extraction": 0, "advice": 1}
+
+llm_request_class = contextvars.ContextVar("llm_request_class", default="interactive")
+
+
+class TokenBucket:
+    """Holds up to one minute's budget, refilled continuously. A limit of 0 means unlimited."""
+
+    def __init__(self, per_minute):
+        self.capacity = per_minute
+        self.rate = per_minute / 60
+        self.tokens = float(per_minute)
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        """Seconds until `amount` tokens are available (amounts above the capacity wait for a full bucket)."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.tokens) / self.rate)
+
+    def adjust(self, amount):
+        """Takes (negative) or gives back (positive) tokens; the balance may go below zero."""
+        if self.capacity > 0:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _WaitStats:
+    """Queue wait times of one scheduling lane, for metrics."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=1024)
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+
+    def stats(self):
+        recent = sorted(self.recent)
+        return {
+            "count": self.count,
+            "avg_seconds": self.total / self.count if self.count else 0.0,
+            "p95_seconds": recent[int(0.95 * (len(recent) - 1))] if recent else 0.0,
+            "max_seconds": self.max,
+        }
+
+
+class _Ticket:
+    __slots__ = ("lane", "tokens", "enqueued_at", "wake", "granted", "cancelled")
+
+    def __init__(self, lane, tokens, wake):
+        self.lane = lane
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.wake = wake
+        self.granted = False
+        self.cancelled = False
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMScheduler:
+    """
+    Admits LLM calls one at a time from a priority queue, as soon as the requests-per-minute
+    and tokens-per-minute buckets both allow the call at its head. Usable from async code and
+    from threads (sync chains); a timer re-checks the queue once the buckets have refilled.
+    """
+
+    def __init__(self, rpm, tpm):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self._queue = []  # (class rank, stage rank, arrival, ticket)
+        self._arrivals = itertools.count()
+        self._lock = threading.Lock()
+        self._timer = None
+        self._paused_until = 0.0
+        self.rate_limited = 0
+        self.waits = {f"{request_class}_{stage}": _WaitStats() for request_class in REQUEST_CLASSES for stage in LLM_STAGES}
+
+    def _enqueue(self, lane, tokens, wake):
+        request_class, stage = lane
+        ticket = _Ticket(f"{request_class}_{stage}", tokens, wake)
+        with self._lock:
+            heapq.heappush(self._queue, (REQUEST_CLASSES[request_class], LLM_STAGES[stage], next(self._arrivals), ticket))
+            self._dispatch()
+        return ticket
+
+    def _dispatch(self):
+        """Admits queued calls in priority order while the buckets allow. Called with the lock held."""
+        now = time.monotonic()
+        while self._queue:
+            ticket = self._queue[0][-1]
+            if ticket.cancelled:
+                heapq.heappop(self._queue)
+                continue
+            delay = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(ticket.tokens, now),
+            )
+            if delay > 0:  # The head waits (strict priority): check again once the buckets have refilled
+                if self._timer is not None:
+                    self._timer.cancel()
+                self._timer = threading.Timer(delay, self._on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+            heapq.heappop(self._queue)
+            self.requests.adjust(-1)
+            self.tokens.adjust(-ticket.tokens)
+            ticket.granted = True
+            self.waits[ticket.lane].add(now - ticket.enqueued_at)
+            ticket.wake()
+
+    def _on_timer(self):
+        with self._lock:
+            self._timer = None
+            self._dispatch()
+
+    async def acquire(self, lane, tokens):
+        """Waits until the call may be sent. lane is (request class, stage); tokens is the reservation."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        ticket = self._enqueue(lane, tokens, lambda: loop.call_soon_threadsafe(_resolve, future))
+        try:
+            if not ticket.granted:
+                await future
+        except asyncio.CancelledError:
+            with self._lock:
+                ticket.cancelled = True
+                if ticket.granted:  # Admitted but never sent: give the budget back
+                    self.requests.adjust(1)
+                    self.tokens.adjust(ticket.tokens)
+            raise
+        return ticket
+
+    def acquire_sync(self, lane, tokens):
+        """Blocking acquire for sync chains (runs in the caller's thread)."""
+        admitted = threading.Event()
+        ticket = self._enqueue(lane, tokens, admitted.set)
+        admitted.wait()
+        return ticket
+
+    def settle(self, ticket, used_tokens):
+        """Replaces the token reservation with the usage Groq reported, when known."""
+        if used_tokens is None:
+            return
+        with self._lock:
+            self.tokens.adjust(ticket.tokens - used_tokens)
+            self._dispatch()
+
+    def rate_limit_hit(self, error):
+        """Groq answered 429 anyway (limits set too high, or shared with another client): pause every lane."""
+        try:
+            retry_after = float(error.response.headers.get("retry-after", "1"))
+        except (AttributeError, ValueError):
+            retry_after = 1.0
+        with self._lock:
+            self.rate_limited += 1
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def stats(self):
+        with self._lock:
+            now = time.monotonic()
+            self.requests.wait_time(0, now)  # Refill before reporting
+            self.tokens.wait_time(0, now)
+            return {
+                "rpm_limit": self.requests.capacity,
+                "tpm_limit": self.tokens.capacity,
+                "requests_available": round(self.requests.tokens, 1),
+                "tokens_available": round(self.tokens.tokens),
+                "queued": sum(1 for *_, ticket in self._queue if not ticket.cancelled),
+                "rate_limited": self.rate_limited,
+                "wait_time": {lane: stats.stats() for lane, stats in self.waits.items()},
+            }
+
+
+llm_scheduler = LLMScheduler(GROQ_RPM_LIMIT, GROQ_TPM_LIMIT)
+
+# Errors worth retrying through the scheduler (the Groq client itself does not retry)
+_RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)
+
+
+def _used_tokens(message):
+    usage = getattr(message, "usage_metadata", None)
+    return usage["total_tokens"] if usage else None
+
+
+class ScheduledChatGroq(ChatGroq):
+    """ChatGroq whose every call (invoke, ainvoke, stream, astream) is admitted by llm_scheduler first."""
+
+    # Scheduling stage of every call made by this model (a field: streamed calls get no run_manager metadata)
+    llm_stage: str = "extraction"
+
+    def _lane(self, run_manager):
+        return llm_request_class.get(), self.llm_stage
+
+    def _reservation(self, messages):
+        """Tokens reserved for a call: ~4 characters per prompt token plus the expected answer."""
+        prompt_tokens = sum(len(str(message.content)) for message in messages) // 4
+        return prompt_tokens + (self.max_tokens or GROQ_EXPECTED_OUTPUT_TOKENS)
+
+    def _retry_delay(self, error, attempt):
+        if isinstance(error, RateLimitError):
+            llm_scheduler.rate_limit_hit(error)
+            return 0.0  # The pause applies inside the scheduler
+        return 0.5 * 2 ** attempt
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            ticket = llm_scheduler.acquire_sync(self._lane(run_manager), self._reservation(messages))
+            try:
+                result = super()._generate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                time.sleep(self._retry_delay(e, attempt))
+                continue
+            llm_scheduler.settle(ticket, _used_tokens(result.generations[0].message))
+            return result
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        for attempt in range(GROQ_MAX_RETRIES + 1):
+            ticket = await llm_scheduler.acquire(self._lane(run_manager), self._reservation(messages))
+            try:
+                result = await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+            except _RETRYABLE_ERRORS as e:
+                if attempt == GROQ_MAX_RETRIES:
+                    raise
+                await asyncio.sleep(self._retry_delay(e, attempt))
+                continue
+            llm_scheduler.settle(ticket, _used_tokens(result.generations[0].message))
+            return result
+
+    # Streams are not retried: part of the answer may already have been shown
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        ticket = llm_scheduler.acquire_sync(self._lane(run_manager), self._reservation(messages))
+        used_tokens = None
+        try:
+            for chunk in super()._stream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                used_tokens = _used_tokens(chunk.message) or used_tokens
+                yield chunk
+        except RateLimitError as e:
+            llm_scheduler.rate_limit_hit(e)
+            raise
+        finally:
+            llm_scheduler.settle(ticket, used_tokens)
+
+    async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+        ticket = await llm_scheduler.acquire(self._lane(run_manager), self._reservation(messages))
+        used_tokens = None
+        try:
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                used_tokens = _used_tokens(chunk.message) or used_tokens
+                yield chunk
+        except RateLimitError as e:
+            llm_scheduler.rate_limit_hit(e)
+            raise
+        finally:
+            llm_scheduler.settle(ticket, used_tokens)
+
+
+def get_scheduler_stats():
+    """Rate-limit budgets, queue depth and queue wait times of the LLM scheduler, for the /metrics endpoint."""
+    return llm_scheduler.stats()
+
+
+# =========================== LLM Client Lifecycle =========================== #
+
+def init_llm():
+    """
+    Builds the Groq client with its pooled HTTP connections, and every chain that calls it.
+    All calls go through llm_scheduler. Called from the app lifespan; later calls return the
+    existing client. Raises if the client cannot be built (e.g. GROQ_API_KEY is missing).
+    """
+    global llm, llm_http_client, csv_advice_chain
+    global income_chain, expenses_chain, concerns_chain, advice_chain, income_window_chain, expenses_window_chain
+    global income_branch, expenses_branch, concerns_branch, advice_branch
+    global budget_parallel_chain, form_parallel_chain, budget_single_chain
+
+    with _llm_lock:
+        if llm is not None:
+            return llm
+
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=GROQ_MAX_CONNECTIONS,
+                max_keepalive_connections=GROQ_MAX_KEEPALIVE,
+                keepalive_expiry=GROQ_KEEPALIVE_EXPIRY,
+            ),
+        )
+        model = ScheduledChatGroq(
+            model=LLM_MODEL,
+            temperature=0.1,  # More deterministic output
+            max_tokens=None,
+            max_retries=0,  # Retried by ScheduledChatGroq, through the scheduler
+            base_url=GROQ_BASE_URL,
+            http_async_client=http_client,
+        )
+
+        advice_model = model.model_copy(update={"llm_stage": "advice"})  # Same client, scheduled after extraction calls
+
+        csv_advice_chain = RunnableParallel(csv=csv_prompt | model, advice=planner_advice_prompt | advice_model)
+
+        income_chain = income_prompt | model
+        expenses_chain = expenses_prompt | model
+        concerns_chain = concerns_prompt | model
+        advice_chain = advice_prompt | advice_model
+        income_window_chain = income_window_prompt | model
+        expenses_window_chain = expenses_window_prompt | model
+
+        income_branch = memoize_branch("income", income_chain, validate=_has_valid_json)
+        expenses_branch = memoize_branch("expenses", expenses_chain, validate=_has_valid_json)
+        concerns_branch = memoize_branch("concerns", concerns_chain)
+        advice_branch = memoize_branch("advice", advice_chain)
+
+        # Optimized Parallel Execution Chain
+        budget_parallel_chain = RunnableParallel(
+            income=income_branch,
+            expenses=expenses_branch,
+            concerns=concerns_branch,
+            advice=advice_branch,
+        )
+        form_parallel_chain = RunnableParallel(
+            concerns=concerns_branch,
+            advice=advice_branch,
+        )
+        budget_single_chain = budget_json_prompt | model
+
+        llm, llm_http_client = model, http_client
+        return llm
+
+
+async def warmup_llm():
+    """
+    Opens a pooled connection to the Groq API before the first request and checks the API
+    key by listing models (no tokens are used). Raises RuntimeError if the key is rejected.
+    """
+    response = await llm_http_client.get(
+        f"{GROQ_BASE_URL}/openai/v1/models",
+        headers={"Authorization": f"Bearer {llm.groq_api_key.get_secret_value()}"},
+    )
+    if response.status_code in (401, 403):
+        raise RuntimeError(f"Groq rejected the API key (HTTP {response.status_code})")
+
+
+async def aclose_llm():
+    """Closes the LLM connection pool. Called from the app lifespan on shutdown."""
+    if llm_http_client is not None:
+        await llm_http_client.aclose()
+
+
 def calculate_savings(income, expenses):
     """Calculate recommended savings based on income and expenses."""
     
@@ -119,18 +623,11 @@ def calculate_savings(income, expenses):
     return recommended_savings
 
 
-# Function to Run Full Budget Analysis
-def run_budget_pipeline(user_input):
-    if not user_input.strip():
-        return {"error": "Please provide financial details."}
+# Assemble the final budget structure from parsed income/expenses and the concerns/advice messages
+def build_budget(income_data, expenses_data, concerns, advice):
+    """Validates the extracted income/expenses and computes totals and savings."""
 
-    extracted_data = budget_parallel_chain.invoke({"input": user_input})
-    
-    # Validate & Parse JSON Responses
-    income_data = extract_json(extracted_data["income"].content)
-    expenses_data = extract_json(extracted_data["expenses"].content)
-    
-    if "error" in income_data or "error" in expenses_data:
+    if not isinstance(income_data, list) or "error" in income_data or "error" in expenses_data:
         print(income_data)
         print(expenses_data)
         return {"error": "AI returned invalid financial data."}
@@ -144,6 +641,369 @@ def run_budget_pipeline(user_input):
         "income": total_income,
         "expenses": total_expenses,
         "savings": recommended_savings,
-        "concerns": extracted_data["concerns"],
-        "advice": extracted_data["advice"]
+        "concerns": concerns,
+        "advice": advice
     }
+
+
+def budget_from_parallel(extracted_data):
+    """Builds the budget from the four branch responses of budget_parallel_chain."""
+
+    # Validate & Parse JSON Responses
+    income_data = extract_json(extracted_data["income"].content)
+    expenses_data = extract_json(extracted_data["expenses"].content)
+
+    return build_budget(income_data, expenses_data, extracted_data["concerns"], extracted_data["advice"])
+
+
+def _as_text(value):
+    """Flattens a concerns/advice JSON value (string or list of points) into text."""
+    if isinstance(value, list):
+        return "\n".join(f"- {item}" for item in value)
+    return "" if value is None else str(value)
+
+
+def budget_from_single(message):
+    """Builds the budget from the one JSON document returned by budget_single_chain."""
+
+    parsed_data = extract_json(message.content)
+    if not isinstance(parsed_data, dict) or "error" in parsed_data:
+        print(parsed_data)
+        return {"error": "AI returned invalid financial data."}
+
+    # Keep concerns/advice as messages so both modes return the same shape
+    return build_budget(
+        parsed_data.get("income"),
+        parsed_data.get("expenses") or [],
+        AIMessage(content=_as_text(parsed_data.get("concerns"))),
+        AIMessage(content=_as_text(parsed_data.get("advice"))),
+    )
+
+
+# =========================== Budget Result Cache =========================== #
+
+def _dump_budget(budget):
+    """Serializes a budget for the SQLite cache (concerns/advice are LangChain messages)."""
+    return json.dumps({
+        key: {"__message__": message_to_dict(value)} if isinstance(value, BaseMessage) else value
+        for key, value in budget.items()
+    })
+
+
+def _load_budget(payload):
+    return {
+        key: messages_from_dict([value["__message__"]])[0] if isinstance(value, dict) and "__message__" in value else value
+        for key, value in json.loads(payload).items()
+    }
+
+
+budget_cache = create_cache(
+    BUDGET_CACHE_BACKEND,
+    max_entries=BUDGET_CACHE_MAX_ENTRIES,
+    ttl_seconds=BUDGET_CACHE_TTL_SECONDS,
+    path=BUDGET_CACHE_PATH,
+    dumps=_dump_budget,
+    loads=_load_budget,
+)
+
+
+def budget_cache_key(user_input, mode):
+    """Cache key: normalized input text + model name + prompt version + extraction mode."""
+    return make_cache_key(LLM_MODEL, PROMPT_VERSION, mode, normalize_text(user_input))
+
+
+def get_cache_stats():
+    """Hit/miss counters of the pipeline caches, for the /metrics endpoint."""
+    return {
+        "budget": budget_cache.stats(),
+        "branches": {name: cache.stats() for name, cache in branch_caches.items()},
+    }
+
+
+# Function to Run Full Budget Analysis
+def run_budget_pipeline(user_input, mode=None):
+    if not user_input.strip():
+        return {"error": "Please provide financial details."}
+
+    init_llm()
+    mode = mode or BUDGET_PIPELINE_MODE
+    cache_key = budget_cache_key(user_input, mode)
+    cached_budget = budget_cache.get(cache_key)
+    if cached_budget is not None:
+        return dict(cached_budget)
+
+    if mode == "single":
+        budget_data = budget_from_single(budget_single_chain.invoke({"input": user_input}))
+    else:
+        budget_data = budget_from_parallel(budget_parallel_chain.invoke({"input": user_input}))
+
+    # Only successful budgets are cached so a bad AI response can be retried
+    if "error" not in budget_data:
+        budget_cache.set(cache_key, budget_data)
+    return budget_data
+
+
+# Async version for the FastAPI endpoints: awaits the LLM calls instead of blocking the event loop
+async def arun_budget_pipeline(user_input, mode=None):
+    if not user_input.strip():
+        return {"error": "Please provide financial details."}
+
+    init_llm()
+    mode = mode or BUDGET_PIPELINE_MODE
+    cache_key = budget_cache_key(user_input, mode)
+    cached_budget = budget_cache.get(cache_key)
+    if cached_budget is not None:
+        return dict(cached_budget)
+
+    if mode == "single":
+        budget_data = budget_from_single(await budget_single_chain.ainvoke({"input": user_input}))
+    else:
+        budget_data = budget_from_parallel(await budget_parallel_chain.ainvoke({"input": user_input}))
+
+    if "error" not in budget_data:
+        budget_cache.set(cache_key, budget_data)
+    return budget_data
+
+
+# =========================== Streaming Budget Analysis =========================== #
+
+def _total_income(income_data):
+    """Sums parsed income sources, or returns None when the income branch is unusable."""
+    if not isinstance(income_data, list) or "error" in income_data:
+        return None
+    return sum(item["amount"] for item in income_data)
+
+
+async def _stream_advice(inputs, queue):
+    """Streams advice tokens into the queue, then the complete advice message."""
+    key = branch_cache_key("advice", inputs["input"])
+    message = branch_caches["advice"].get(key)
+
+    if message is not None:
+        await queue.put(("advice_delta", message.content))
+    else:
+        merged = None
+        async for chunk in advice_chain.astream(inputs):
+            await queue.put(("advice_delta", chunk.content))
+            merged = chunk if merged is None else merged + chunk
+        message = AIMessage(
+            content=merged.content if merged else "",
+            response_metadata=merged.response_metadata if merged else {},
+            usage_metadata=merged.usage_metadata if merged else None,
+        )
+        branch_caches["advice"].set(key, message)
+
+    await queue.put(("advice", message))
+
+
+async def astream_budget_pipeline(user_input):
+    """
+    Runs the budget branches concurrently and yields (event, data) pairs as each one resolves:
+    income, expenses, savings (once both are known), concerns, advice token deltas, and finally
+    done with the complete budget. Always uses the four-branch extraction.
+    """
+    if not user_input.strip():
+        yield "error", {"error": "Please provide financial details."}
+        return
+
+    init_llm()
+    cache_key = budget_cache_key(user_input, "parallel")
+    cached_budget = budget_cache.get(cache_key)
+    if cached_budget is not None:
+        yield "income", {"income": cached_budget["income"]}
+        yield "expenses", {"expenses": cached_budget["expenses"]}
+        yield "savings", {"savings": cached_budget["savings"]}
+        yield "concerns", {"concerns": cached_budget["concerns"].content}
+        yield "advice", {"delta": cached_budget["advice"].content}
+        yield "done", {"budget": dict(cached_budget)}
+        return
+
+    inputs = {"input": user_input}
+    queue = asyncio.Queue()
+
+    async def run_branch(name, branch):
+        await queue.put((name, await branch.ainvoke(inputs)))
+
+    async def guarded(name, coro):
+        try:
+            await coro
+        except Exception as e:  # Surface branch failures as an error event instead of a broken stream
+            await queue.put((name, e))
+
+    tasks = [
+        asyncio.create_task(guarded("income", run_branch("income", income_branch))),
+        asyncio.create_task(guarded("expenses", run_branch("expenses", expenses_branch))),
+        asyncio.create_task(guarded("concerns", run_branch("concerns", concerns_branch))),
+        asyncio.create_task(guarded("advice", _stream_advice(inputs, queue))),
+    ]
+
+    results = {}
+    total_income = expenses_list = None
+    try:
+        while len(results) < len(tasks):
+            name, value = await queue.get()
+            if name == "advice_delta":
+                yield "advice", {"delta": value}
+                continue
+            if isinstance(value, Exception):
+                print(value)
+                yield "error", {"error": f"The {name} step failed.", "branch": name}
+                return
+            results[name] = value
+
+            if name == "income":
+                total_income = _total_income(extract_json(value.content))
+                if total_income is None:
+                    yield "error", {"error": "AI returned invalid financial data.", "branch": name}
+                    return
+                yield "income", {"income": total_income}
+            elif name == "expenses":
+                expenses_data = extract_json(value.content)
+                if "error" in expenses_data:
+                    yield "error", {"error": "AI returned invalid financial data.", "branch": name}
+                    return
+                expenses_list = expenses_data if isinstance(expenses_data, list) else []
+                yield "expenses", {"expenses": expenses_list}
+            elif name == "concerns":
+                yield "concerns", {"concerns": value.content}
+
+            if name in ("income", "expenses") and total_income is not None and expenses_list is not None:
+                yield "savings", {"savings": calculate_savings(total_income, expenses_list)}
+
+        budget_data = budget_from_parallel(results)
+        budget_cache.set(cache_key, budget_data)
+        yield "done", {"budget": budget_data}
+    finally:
+        for task in tasks:
+            task.cancel()
+
+# =========================== Incremental Budget Analysis =========================== #
+
+def _item_name(item, name_key):
+    return normalize_text(str(item.get(name_key, ""))) if isinstance(item, dict) else None
+
+
+def _window_context(texts, max_chars=BUDGET_SEGMENT_CONTEXT_CHARS):
+    """The last max_chars of the transcript before a window, cut at a word boundary."""
+    context = " ".join(texts)
+    if len(context) > max_chars:
+        context = context[-max_chars:].split(" ", 1)[-1]
+    return context
+
+
+def _merge_items(responses, name_key):
+    """
+    Merges the income or expense lists extracted from successive transcript windows. Later
+    windows only report new items and corrections, so an item whose name (name_key) was already
+    extracted replaces the earlier one instead of being counted twice. A window that mentions
+    none may not come back as a JSON list; it is skipped unless every window failed.
+    """
+    items, error = [], None
+    for message in responses:
+        parsed_data = extract_json(message.content)
+        if not isinstance(parsed_data, list):
+            error = parsed_data
+            continue
+        names = {_item_name(item, name_key) for item in parsed_data} - {None}
+        items = [item for item in items if _item_name(item, name_key) not in names]
+        items.extend(parsed_data)
+    return error if error is not None and not items else items
+
+
+async def arun_budget_pipeline_from_segments(segments, mode=None):
+    """
+    Budget analysis of a transcript that arrives as an async iterator of final segments (e.g. from
+    live transcription). In "parallel" mode income and expenses are extracted from each window as
+    soon as it is complete, so those LLM calls overlap the rest of the transcription. Windows start
+    at BUDGET_SEGMENT_MIN_CHARS and double up to BUDGET_SEGMENT_MAX_CHARS; each one after the first
+    is sent with the end of the transcript before it (see _window_context) and only its new items
+    are kept. Concerns and advice need the whole picture and run on the full transcript. Budgets
+    are cached by transcript, so a replayed transcript (see replay_segments) gets the same budget.
+    A transcript shorter than one window, or "single" mode, goes through arun_budget_pipeline
+    unchanged. Returns (transcript, budget).
+    """
+    init_llm()
+    mode = mode or BUDGET_PIPELINE_MODE
+    texts, window, extractions = [], [], []
+    window_chars = BUDGET_SEGMENT_MIN_CHARS
+
+    def extract(text):
+        if not extractions:
+            calls = income_branch.ainvoke({"input": text}), expenses_branch.ainvoke({"input": text})
+        else:
+            inputs = {"context": _window_context(texts[:len(texts) - len(window)]), "input": text}
+            calls = income_window_chain.ainvoke(inputs), expenses_window_chain.ainvoke(inputs)
+        extractions.append(asyncio.gather(*calls))
+
+    try:
+        async for text in segments:
+            texts.append(text)
+            window.append(text)
+            if mode != "single" and sum(len(part) for part in window) >= window_chars:
+                extract(" ".join(window))
+                window = []
+                window_chars = max(window_chars, min(2 * window_chars, BUDGET_SEGMENT_MAX_CHARS))
+
+        transcript = " ".join(texts)
+        if not extractions:
+            return transcript, await arun_budget_pipeline(transcript, mode)
+
+        cache_key = budget_cache_key(transcript, "segments")
+        cached_budget = budget_cache.get(cache_key)
+        if cached_budget is not None:
+            return transcript, dict(cached_budget)
+        if window:
+            extract(" ".join(window))
+
+        inputs = {"input": transcript}
+        windows, concerns, advice = await asyncio.gather(
+            asyncio.gather(*extractions), concerns_branch.ainvoke(inputs), advice_branch.ainvoke(inputs)
+        )
+    finally:
+        for extraction in extractions:
+            extraction.cancel()  # Transcription failed midway (or a cache hit): drop the extractions still in flight
+        await asyncio.gather(*extractions, return_exceptions=True)
+
+    budget_data = build_budget(
+        _merge_items((income for income, _ in windows), "source"),
+        _merge_items((expenses for _, expenses in windows), "category"),
+        concerns,
+        advice,
+    )
+    if "error" not in budget_data:
+        budget_cache.set(cache_key, budget_data)
+    return transcript, budget_data
+
+
+async def replay_segments(texts):
+    """Feeds already transcribed segments (e.g. a cached transcription) to arun_budget_pipeline_from_segments."""
+    for text in texts:
+        yield text
+
+
+def _form_expenses(expenses):
+    """Normalizes form expense rows to {"category", "amount"} with numeric amounts."""
+    rows = []
+    for exp in expenses:
+        try:
+            amount = float(exp.get("amount"))
+        except (TypeError, ValueError):
+            amount = None
+        rows.append({"category": exp.get("category", ""), "amount": amount})
+    return rows
+
+
+# Fast path for the form endpoint: totals and savings are computed locally, the LLM only writes concerns & advice
+async def arun_form_budget_pipeline(income, expenses, user_input):
+    if not user_input.strip():
+        return {"error": "Please provide financial details."}
+
+    init_llm()
+    extracted_data = await form_parallel_chain.ainvoke({"input": user_input})
+
+    return build_budget(
+        [{"source": "Monthly income", "amount": income}],
+        _form_expenses(expenses),
+        extracted_data["concerns"],
+        extracted_data["advice"],
+    )
@@ -1,20 +1,62 @@
 from dotenv import load_dotenv
-from fastapi import FastAPI, UploadFile, File, HTTPException
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from vosk import Model, KaldiRecognizer
-import wave
-import pandas as pd
+import asyncio
+import importlib
 import os
 import json
-import requests
-import uuid  # Import UUID for unique filenames
-from langchain_pipeline import run_budget_pipeline
+import re
+from contextlib import asynccontextmanager
+from email.utils import formatdate, parsedate_to_datetime
+from transcription import (
+    AUDIO_BUDGET_STREAMING,
+    AUDIO_NORMALIZE,
+    TranscriptionError,
+    create_transcriber,
+    normalize_audio,
+    stream_recording,
+    transcribe_recording,
+    transcription_cache,
+    transcription_cache_key,
+)
+from jobs import JobManager, QueueFullError, create_job_store
+from budget_export import EXPORT_FORMATS, EXPORT_VERSION, ExportUnavailableError, shutdown_export_executor
+from artifacts import ArtifactStore
+from uploads import UploadError, receive_upload
 
 load_dotenv()
 
-app = FastAPI()
+# Warm the Groq pool and the transcription backend at startup (set to 0 when the APIs are unreachable, e.g. in CI)
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # Readiness checks, filled in by prewarm() and reported by /ready
+    app.state.checks = {"transcription": "pending", "llm": "pending"}
+
+    await transcriber.start()
+    await job_manager.start()
+    # Background sweeper enforcing the TTL and disk quota of budgets/
+    app.state.artifact_lifecycle = asyncio.create_task(artifact_store.run_lifecycle())
+    # Clients are built and warmed in the background: the worker starts serving right away and /ready turns 200 when done
+    app.state.prewarm = asyncio.create_task(prewarm(app.state.checks))
+
+    yield
+
+    app.state.prewarm.cancel()
+    app.state.artifact_lifecycle.cancel()
+    await job_manager.stop()
+    shutdown_export_executor()
+    await transcriber.aclose()
+    if _pipeline is not None:
+        await _pipeline.aclose_llm()
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Enable CORS for frontend access
 app.add_middleware(
@@ -26,10 +68,9 @@ app.add_middleware(
 )
 
 
-# Deepgram API Key (Load from Environment Variable)
-DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
-if not DEEPGRAM_API_KEY:
-    raise Exception("⚠️ Deepgram API Key is missing! Set DEEPGRAM_API_KEY in your environment variables.")
+# Transcription backend selected by TRANSCRIPTION_BACKEND: Deepgram (one keep-alive connection
+# pool for the lifetime of the app) or offline Vosk (a pool of decoder processes)
+transcriber = create_transcriber()
 
 class BudgetRequest(BaseModel):
     prompt: str  # User's budget input (e.g., "I earn $5000 and spend $2000 on rent")
@@ -41,41 +82,213 @@ class BudgetFormRequest(BaseModel):
     concerns: str = ""  # Optional financial concerns
 
 
-@app.post("/transcribe_audio")
-async def transcribe_audio(file: UploadFile = File(...)):
-    """
-    Receives an audio file and sends it to Deepgram for transcription.
-    Returns the transcribed text.
-    """
+# The LangChain/Groq stack is the slowest import by far: it is loaded after startup by prewarm()
+# (or by the first request that needs it), in a thread so the event loop is not stalled while it imports
+_pipeline = None
 
-    # Read the uploaded file into memory
-    audio_bytes = await file.read()
 
-    # Deepgram API URL
-    url = "https://api.deepgram.com/v1/listen"
+def _import_pipeline():
+    pipeline = importlib.import_module("langchain_pipeline")
+    pipeline.init_llm()
+    return pipeline
+
+
+async def load_pipeline():
+    """Returns the pipeline module, raising 503 (with the /ready detail) if the LLM client cannot be built."""
+    global _pipeline
+    if _pipeline is None:
+        try:
+            _pipeline = await asyncio.to_thread(_import_pipeline)
+        except Exception as e:  # Missing GROQ_API_KEY, broken install
+            raise HTTPException(status_code=503, detail=f"LLM unavailable: {e!r}")
+    return _pipeline
+
+
+async def prewarm_transcription(checks):
+    config_error = transcriber.config_error()
+    if config_error is not None:
+        checks["transcription"] = config_error
+        return
+    try:
+        if WARMUP_ON_STARTUP:
+            await transcriber.warmup()
+        checks["transcription"] = "ok"
+    except TranscriptionError as e:
+        checks["transcription"] = e.detail
+
+
+async def prewarm_llm(checks):
+    try:
+        pipeline = await load_pipeline()
+        if WARMUP_ON_STARTUP:
+            await pipeline.warmup_llm()
+        checks["llm"] = "ok"
+    except HTTPException as e:
+        checks["llm"] = e.detail
+    except Exception as e:  # Rejected key, unreachable API
+        checks["llm"] = f"LLM unavailable: {e!r}"
 
-    # Headers for Deepgram API
-    headers = {
-        "Authorization": f"Token {DEEPGRAM_API_KEY}",
-        "Content-Type": file.content_type,  # Automatically detects file type
-    }
 
-    # Send Audio to Deepgram
-    response = requests.post(url, headers=headers, data=audio_bytes)
+async def prewarm(checks):
+    """Builds the LLM and transcription clients and warms their connection pools, recording the outcome in checks."""
+    await asyncio.gather(prewarm_transcription(checks), prewarm_llm(checks))
 
-    # Check for errors
-    if response.status_code != 200:
-        raise HTTPException(status_code=response.status_code, detail=f"Deepgram Error: {response.json()}")
 
-    # Extract Transcription
-    transcript_data = response.json()
-    transcript_text = transcript_data.get("results", {}).get("channels", [{}])[0].get("alternatives", [{}])[0].get("transcript", "")
+# Budget records + lazily rendered workbooks under budgets/ (sharded, indexed, swept in the background)
+artifact_store = ArtifactStore()
 
-    return {"transcription": transcript_text}
+
+async def run_budget_job(payload):
+    """Background job: generates the budget and stores it for download."""
+    pipeline = await load_pipeline()
+    request_class = pipeline.llm_request_class.set("batch")  # Its LLM calls queue behind interactive requests
+    try:
+        budget_data = await pipeline.arun_budget_pipeline(payload["prompt"])
+    finally:
+        pipeline.llm_request_class.reset(request_class)
+    if "error" in budget_data:
+        return {"error": budget_data["error"]}
+
+    budget_id = await artifact_store.save(budget_data)
+    return jsonable_encoder({
+        "budget": budget_data,
+        "excel_url": f"/download/budget_{budget_id}.xlsx"
+    })
+
+
+# Bounded worker pool for background budget jobs
+job_manager = JobManager(run_budget_job, create_job_store())
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 200 once the clients are built and warmed, 503 with the failing checks otherwise."""
+    checks = app.state.checks
+    is_ready = all(status == "ok" for status in checks.values())
+    return JSONResponse({"ready": is_ready, "checks": checks}, status_code=200 if is_ready else 503)
+
+
+# The audio upload is read from the raw request stream (see receive_upload), so document its body by hand
+AUDIO_UPLOAD_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {"type": "object", "required": ["file"], "properties": {"file": {"type": "string", "format": "binary"}}}
+            },
+            "audio/*": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+@app.post("/transcribe_audio", openapi_extra=AUDIO_UPLOAD_BODY)
+async def transcribe_audio(request: Request, chunked: bool | None = None, normalize: bool | None = None):
+    """
+    Receives an audio file (multipart `file` field or a raw audio body) and transcribes it with
+    the configured backend (Deepgram or Vosk). WAV uploads are first converted to 16 kHz mono
+    with silence trimmed (normalize=false, or AUDIO_NORMALIZE=0, sends them unchanged).
+    Long WAV recordings are split at silences and the segments transcribed in parallel
+    (chunked=true forces this for any WAV, chunked=false disables it).
+    Returns the transcribed text, plus timestamped segments when the recording was chunked.
+    A clip that was already transcribed with the same options is answered from the cache.
+    """
+
+    # Spool the upload to a temporary file (bounded RAM), rejecting it with 413 once it exceeds MAX_UPLOAD_BYTES
+    try:
+        upload = await receive_upload(request)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    # Same clip, same options: skip normalization and the backend call
+    normalize = AUDIO_NORMALIZE if normalize is None else normalize
+    cache_key = transcription_cache_key(upload.sha256, normalize, {None: "auto", True: "chunked", False: "single"}[chunked])
+    cached_result = transcription_cache.get(cache_key)
+    if cached_result is not None:
+        await upload.close()
+        return cached_result
+
+    audio, content_type, trimmed = upload.file, upload.content_type, 0.0
+    normalized = await normalize_audio(upload.file) if normalize else None
+    if normalized is not None:
+        audio, trimmed = normalized
+        content_type = "audio/wav"
+
+    # Stream the audio to Deepgram over the shared connection pool, or decode it in the Vosk process pool
+    try:
+        if chunked is False:
+            transcript_text, segments = await transcriber.transcribe(audio, content_type), None
+        else:
+            min_seconds = {"min_seconds": 0} if chunked else {}
+            transcript_text, segments = await transcribe_recording(
+                transcriber, audio, content_type, start_offset=trimmed, **min_seconds
+            )
+    except TranscriptionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    finally:
+        if normalized is not None:
+            audio.close()
+        await upload.close()
+
+    result = {"transcription": transcript_text}
+    if segments is not None:
+        result["segments"] = segments
+    transcription_cache.set(cache_key, result)
+    return result
+
+
+@app.websocket("/ws/transcribe")
+async def transcribe_audio_stream(websocket: WebSocket, encoding: str | None = None, sample_rate: int = 16000):
+    """
+    Live transcription. The client sends audio as binary messages while the user speaks
+    (raw 16-bit mono PCM with ?encoding=linear16&sample_rate=..., or a container stream such
+    as WebM/Opus for Deepgram) and a text message "EOF" when done. The server answers with
+    {"type": "partial" | "final", "text": ...} as results arrive, then
+    {"type": "done", "transcription": <all final segments>} and closes.
+    """
+    await websocket.accept()
+    try:
+        stream = await transcriber.open_stream(encoding=encoding, sample_rate=sample_rate)
+    except TranscriptionError as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=1011)
+        return
+
+    async def forward_audio():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    await stream.send(message["bytes"])
+                elif message.get("text") == "EOF":
+                    break
+        finally:
+            await stream.end()
+
+    forwarder = asyncio.create_task(forward_audio())
+    finals = []
+    try:
+        async for kind, text in stream.events():
+            if kind == "final":
+                finals.append(text)
+            await websocket.send_json({"type": kind, "text": text})
+        await forwarder
+        await websocket.send_json({"type": "done", "transcription": " ".join(finals)})
+        await websocket.close()
+    except TranscriptionError as e:
+        await websocket.send_json({"type": "error", "detail": e.detail})
+        await websocket.close(code=1011)
+    except WebSocketDisconnect:
+        pass  # Client went away: nothing left to send
+    finally:
+        forwarder.cancel()
+        await stream.aclose()
 
 @app.post("/generate_budget_from_form")
 async def generate_budget_from_form(request: BudgetFormRequest):
-    """Processes structured budget data from the form, generates an AI-enhanced budget, and saves an Excel file."""
+    """Processes structured budget data from the form, generates an AI-enhanced budget, and stores it for Excel download."""
     
     # Convert form input into a prompt format for AI pipeline
     user_input = f"My monthly income is ${request.income}. "
@@ -87,78 +300,239 @@ async def generate_budget_from_form(request: BudgetFormRequest):
     if request.concerns:
         user_input += f"My financial concerns are: {request.concerns}. "
 
-    # Send structured input to AI pipeline
-    budget_data = run_budget_pipeline(user_input)
+    # Income & expenses are already structured: compute totals locally, ask the AI only for concerns & advice
+    pipeline = await load_pipeline()
+    budget_data = await pipeline.arun_form_budget_pipeline(request.income, request.expenses, user_input)
 
     # Handle errors from AI pipeline
     if "error" in budget_data:
         return {"error": budget_data["error"]}
 
-    # Convert structured JSON to DataFrame
-    df = pd.DataFrame(budget_data["expenses"])
-
-    # Add Income and Savings Summary
-    income_row = pd.DataFrame([{"category": "Income", "amount": budget_data["income"]}])
-    savings_row = pd.DataFrame([{"category": "Recommended Savings", "amount": budget_data["savings"]}])
-    df = pd.concat([income_row, df, savings_row], ignore_index=True)
-
-    # Ensure "budgets/" folder exists
-    os.makedirs("budgets", exist_ok=True)
-
-    # Generate Unique Filename (e.g., budgets/budget_abc123.xlsx)
-    unique_filename = f"budget_{uuid.uuid4().hex}.xlsx"
-    file_path = os.path.join("budgets", unique_filename)
-
-    # Save the file
-    df.to_excel(file_path, index=False)
+    # Store the budget only: the workbook is rendered when it is first downloaded
+    budget_id = await artifact_store.save(budget_data)
 
     return {
         "budget": budget_data,
-        "excel_url": f"/download/{unique_filename}"  # Return unique file path
+        "excel_url": f"/download/budget_{budget_id}.xlsx"  # Return unique file path
     }
 
 @app.post("/generate_budget")
 async def generate_budget(request: BudgetRequest):
-    """Processes user input, generates structured budget JSON, and saves an Excel file."""
+    """Processes user input, generates structured budget JSON, and stores it for Excel download."""
     
     # Call AI-powered pipeline to generate structured budget data
-    budget_data = run_budget_pipeline(request.prompt)
+    pipeline = await load_pipeline()
+    budget_data = await pipeline.arun_budget_pipeline(request.prompt)
 
     # Handle errors from AI pipeline
     if "error" in budget_data:
         return {"error": budget_data["error"]}
 
-    # Convert structured JSON to DataFrame
-    df = pd.DataFrame(budget_data["expenses"])
-
-    # Add Income and Savings Summary
-    income_row = pd.DataFrame([{"category": "Income", "amount": budget_data["income"]}])
-    savings_row = pd.DataFrame([{"category": "Recommended Savings", "amount": budget_data["savings"]}])
-    df = pd.concat([income_row, df, savings_row], ignore_index=True)
+    # Store the budget only: the workbook is rendered when it is first downloaded
+    budget_id = await artifact_store.save(budget_data)
 
-    # Ensure "budgets/" folder exists
-    os.makedirs("budgets", exist_ok=True)
+    return {
+        "budget": budget_data,
+        "excel_url": f"/download/budget_{budget_id}.xlsx"  # Return unique file path
+    }
 
-    # Generate Unique Filename (e.g., budgets/budget_abc123.xlsx)
-    unique_filename = f"budget_{uuid.uuid4().hex}.xlsx"
-    file_path = os.path.join("budgets", unique_filename)
+@app.post("/generate_budget_from_audio", openapi_extra=AUDIO_UPLOAD_BODY)
+async def generate_budget_from_audio(request: Request, stream: bool | None = None):
+    """
+    Voice-to-budget in one request: transcribes the uploaded recording and feeds the transcript
+    straight into the budget pipeline. With streaming (AUDIO_BUDGET_STREAMING, or stream=true)
+    the recording goes through the backend's live API and income/expense extraction starts on
+    the final segments while the tail is still being decoded; with stream=false it is
+    transcribed first. Returns the transcription, the budget and its download URL.
+    A re-uploaded clip reuses its cached transcription and only reruns the budget step.
+    """
+    try:
+        upload = await receive_upload(request)
+    except UploadError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+
+    streaming = AUDIO_BUDGET_STREAMING if stream is None else stream
+    cache_key = transcription_cache_key(upload.sha256, AUDIO_NORMALIZE, "stream" if streaming else "auto")
+    cached_result = transcription_cache.get(cache_key)
+
+    pipeline = await load_pipeline()
+    normalized = None
+    try:
+        if cached_result is not None:
+            transcript_text = cached_result["transcription"]
+            if streaming:
+                # Same function (and budget cache entry) as the first upload of this clip
+                _, budget_data = await pipeline.arun_budget_pipeline_from_segments(
+                    pipeline.replay_segments([transcript_text])
+                )
+            else:
+                budget_data = await pipeline.arun_budget_pipeline(transcript_text)
+        else:
+            audio, content_type, trimmed = upload.file, upload.content_type, 0.0
+            normalized = await normalize_audio(upload.file) if AUDIO_NORMALIZE else None
+            if normalized is not None:
+                audio, trimmed = normalized
+                content_type = "audio/wav"
+
+            if streaming:
+                transcript_text, budget_data = await pipeline.arun_budget_pipeline_from_segments(
+                    stream_recording(transcriber, audio)
+                )
+                transcription_cache.set(cache_key, {"transcription": transcript_text})
+            else:
+                transcript_text, segments = await transcribe_recording(
+                    transcriber, audio, content_type, start_offset=trimmed
+                )
+                # Same entry as /transcribe_audio, cached before the budget step so a retry after an AI error skips it
+                result = {"transcription": transcript_text}
+                if segments is not None:
+                    result["segments"] = segments
+                transcription_cache.set(cache_key, result)
+                budget_data = await pipeline.arun_budget_pipeline(transcript_text)
+    except TranscriptionError as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    finally:
+        if normalized is not None:
+            audio.close()
+        await upload.close()
+
+    # Handle errors from AI pipeline (the transcription is still returned so the client can fix it up)
+    if "error" in budget_data:
+        return {"error": budget_data["error"], "transcription": transcript_text}
 
-    # Save the file
-    df.to_excel(file_path, index=False)
+    budget_id = await artifact_store.save(budget_data)
 
     return {
+        "transcription": transcript_text,
         "budget": budget_data,
-        "excel_url": f"/download/{unique_filename}"  # Return unique file path
+        "excel_url": f"/download/budget_{budget_id}.xlsx"
     }
 
+@app.post("/generate_budget/stream")
+async def generate_budget_stream(request: BudgetRequest):
+    """Streams the budget as Server-Sent Events: each section is sent as soon as its AI branch finishes."""
+
+    pipeline = await load_pipeline()
+
+    async def event_stream():
+        async for event, data in pipeline.astream_budget_pipeline(request.prompt):
+            yield f"event: {event}\ndata: {json.dumps(jsonable_encoder(data))}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},  # Don't let proxies buffer events
+    )
+
+@app.post("/jobs/budget")
+async def submit_budget_job(request: BudgetRequest):
+    """Queues budget generation in the background and returns a job id to poll."""
+    try:
+        job_id = job_manager.submit({"prompt": request.prompt})
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    return {"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}
+
+@app.get("/jobs/{job_id}")
+async def get_budget_job(job_id: str):
+    """Returns the status of a background budget job, and its result once finished."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+# Downloadable artifacts are named budget_<32 hex chars>.<format>; anything else never touches the filesystem
+ARTIFACT_NAME = re.compile(r"budget_([0-9a-f]{32})\.([a-z]+)")
+
+# An artifact URL always serves the same bytes, so the client may cache it for a year. Budgets are
+# personal: "private" keeps shared caches (proxies, CDNs) from storing them
+ARTIFACT_CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def is_not_modified(request, etag, last_modified):
+    """Evaluates If-None-Match / If-Modified-Since against the artifact's validators."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in candidates or etag in candidates
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
 @app.get("/download/{filename}")
-async def download_budget(filename: str):
-    """Serves the requested budget Excel file for download."""
-    file_path = os.path.join("budgets", filename)
-    if os.path.exists(file_path):
-        return FileResponse(
-            file_path,
-            filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-        )
-    return {"error": "File not found"}
+async def download_budget(request: Request, filename: str, format: str | None = None):
+    """
+    Serves the requested budget for download. budget_<id>.xlsx is rendered on first request
+    and cached; other formats (csv, ndjson, parquet, or ?format=...) are streamed straight
+    from the stored budget data. Responses carry ETag/Last-Modified validators, answer
+    conditional requests with 304, and workbooks support Range requests.
+    """
+    match = ARTIFACT_NAME.fullmatch(filename)
+    export_format = (format or (match.group(2) if match else "")).lower()
+    if match is None or export_format not in EXPORT_FORMATS:
+        return JSONResponse({"error": "File not found"}, status_code=404)
+    budget_id = match.group(1)
+
+    last_modified = await asyncio.to_thread(artifact_store.last_modified, budget_id)
+    if last_modified is None:
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    etag = f'"{budget_id}-{export_format}-{EXPORT_VERSION}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(last_modified, usegmt=True),
+        "Cache-Control": ARTIFACT_CACHE_CONTROL,
+    }
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    download_name = f"budget_{budget_id}.{export_format}"
+    if export_format == "xlsx" and format is None:
+        file_path = await artifact_store.render_workbook(budget_id)
+        if file_path is not None:
+            # FileResponse handles Range/If-Range and uses the server's zero-copy
+            # "pathsend" extension when available, chunked reads otherwise
+            return FileResponse(
+                file_path,
+                headers=headers,
+                filename=download_name,
+                media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+            )
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    budget_data = await asyncio.to_thread(artifact_store.load_record, budget_id)
+    if budget_data is None:
+        return JSONResponse({"error": "File not found"}, status_code=404)
+
+    media_type, iter_chunks = EXPORT_FORMATS[export_format]
+    try:
+        # The generators return at once, but the parquet export builds its whole file before returning
+        chunks = await asyncio.to_thread(iter_chunks, budget_data)
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=501, detail=str(e))
+
+    headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    return StreamingResponse(
+        chunks,  # Sync generator: Starlette iterates it in a worker thread
+        media_type=media_type,
+        headers=headers,
+    )
+
+@app.get("/metrics")
+async def metrics():
+    """Reports cache hit/miss counters, LLM scheduler queue waits, background job queue and artifact metrics."""
+    # LLM stats only once the pipeline is loaded: scraping must not force the import (or fail without GROQ_API_KEY)
+    pipeline_stats = _pipeline.get_cache_stats() if _pipeline is not None else {}
+    return {
+        "cache": {**pipeline_stats, "transcription": transcription_cache.stats()},
+        "llm": _pipeline.get_scheduler_stats() if _pipeline is not None else None,
+        "jobs": job_manager.stats(),
+        "artifacts": artifact_store.stats(),
+    }
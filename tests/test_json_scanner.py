@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from json_scanner import _MAX_RESTARTS, JSONScanner, find_first_json
+
+CASES = [
+    ('{"a": 1}', {"a": 1}),
+    ('Here you go: [{"source": "Job", "amount": 5000}] Hope it helps!', [{"source": "Job", "amount": 5000}]),
+    ('Income: [{"amount": 1}]\nExpenses: [{"amount": 2}]', [{"amount": 1}]),
+    ('Result: {"note": "use } and ] freely", "x": [1]} done', {"note": "use } and ] freely", "x": [1]}),
+    ('x {"a": "say \\"hi\\" {"} y', {"a": 'say "hi" {'}),
+    ('{"path": "C:\\\\"} tail }', {"path": "C:\\"}),
+    ('Use the {format} below: {"a": 2}', {"a": 2}),
+    ("oops [1, 2} then [3]", [3]),
+    ("I could not find any numbers.", None),
+    ('{"a": [1, 2', None),
+    ('He said "hi {" then [1]', [1]),
+    ('He said "hi {" and "bye" then {"a": 1}', {"a": 1}),
+    ("[" * 5000 + "]" * 5000 + ' then {"a": 1}', {"a": 1}),
+]
+
+
+def scan_chunks(chunks):
+    scanner = JSONScanner()
+    for chunk in chunks:
+        scanner.feed(chunk)
+        if scanner.done:
+            return scanner.value
+    return scanner.finish()
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_find_first_json(text, expected):
+    assert find_first_json(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_chunked_input_matches_whole_input(text, expected, size):
+    assert scan_chunks(text[i:i + size] for i in range(0, len(text), size)) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('x {"a": "say \\"hi\\""} y', {"a": 'say "hi"'}),
+    ('{"path": "C:\\\\", "b": [1]} }', {"path": "C:\\", "b": [1]}),
+    ('He said "hi {" then [1]', [1]),
+])
+def test_every_split_point(text, expected):
+    # Splits inside escapes, strings and brackets must not change the result
+    for split in range(len(text) + 1):
+        assert scan_chunks([text[:split], text[split:]]) == expected, split
+
+
+def test_feed_returns_the_value_once_complete():
+    scanner = JSONScanner()
+    assert scanner.feed('Sure: {"a": ') is None
+    assert scanner.feed('[1, 2]} and {"b": 2}') == {"a": [1, 2]}
+    assert scanner.done
+    assert scanner.feed('{"c": 3}') == {"a": [1, 2]}
+
+
+def test_unparsable_balanced_candidates_are_skipped():
+    text = "{x} " * 1000 + json.dumps({"ok": 1})
+    assert find_first_json(text) == {"ok": 1}
+
+
+def test_restarts_are_bounded():
+    # Each unclosed prose bracket followed by a quote costs one rescan; past the limit the JSON is not found
+    assert find_first_json('x {" ' * _MAX_RESTARTS + "[1]") == [1]
+    assert find_first_json('x {" ' * (_MAX_RESTARTS + 1) + "[1]") is None
+
+
+def test_json_inside_an_unclosed_prose_bracket():
+    # Rescanned only when the unclosed span contains a string; otherwise not found (documented limitation)
+    assert find_first_json('see [note: {"a": 1}') == {"a": 1}
+    assert find_first_json("see [note: [1, 2]") is None
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+import sys
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("GROQ_API_KEY", "test-placeholder")  # Never sent anywhere: Groq is stubbed
+
+import langchain_pipeline
+
+
+class GroqStub(httpx.AsyncBaseTransport):
+    """Answers chat completions, as one JSON body or as an SSE stream when the request asks for it."""
+
+    async def handle_async_request(self, request):
+        body = json.loads(await request.aread())
+        message = {"role": "assistant", "content": "Save more."}
+        if not body.get("stream"):
+            return httpx.Response(200, json={
+                "id": "stub", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+            })
+        chunk = {
+            "id": "stub", "object": "chat.completion.chunk", "created": 0, "model": body["model"],
+            "choices": [{"index": 0, "delta": message, "finish_reason": "stop"}],
+        }
+        events = f"data: {json.dumps(chunk)}\n\ndata: [DONE]\n\n"
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=events.encode())
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    scheduler = langchain_pipeline.LLMScheduler(0, 0)
+    monkeypatch.setattr(langchain_pipeline, "llm_scheduler", scheduler)
+    return scheduler
+
+
+@pytest.fixture
+def models():
+    """An extraction model and its advice copy, built the way init_llm builds them."""
+    model = langchain_pipeline.ScheduledChatGroq(
+        model=langchain_pipeline.LLM_MODEL,
+        max_retries=0,
+        http_async_client=httpx.AsyncClient(transport=GroqStub()),
+    )
+    return model, model.model_copy(update={"llm_stage": "advice"})
+
+
+def lane_counts(scheduler):
+    return {lane: waits.count for lane, waits in scheduler.waits.items() if waits.count}
+
+
+def test_advice_calls_use_the_advice_lane(scheduler, models):
+    model, advice_model = models
+    asyncio.run(model.ainvoke("extract"))
+    asyncio.run(advice_model.ainvoke("advise"))
+    assert lane_counts(scheduler) == {"interactive_extraction": 1, "interactive_advice": 1}
+
+
+def test_streamed_advice_uses_the_advice_lane(scheduler, models):
+    _, advice_model = models
+
+    async def stream():
+        return "".join([chunk.content async for chunk in advice_model.astream("advise")])
+
+    assert asyncio.run(stream()) == "Save more."
+    assert lane_counts(scheduler) == {"interactive_advice": 1}
+
+
+def test_batch_requests_use_the_batch_lanes(scheduler, models):
+    _, advice_model = models
+
+    async def job():
+        langchain_pipeline.llm_request_class.set("batch")
+        async for _ in advice_model.astream("advise"):
+            pass
+
+    asyncio.run(job())
+    assert lane_counts(scheduler) == {"batch_advice": 1}
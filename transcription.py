@@ -0,0 +1,602 @@
+import asyncio
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import wave
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlencode
+import httpx
+from dotenv import load_dotenv
+from budget_cache import create_cache, make_cache_key
+
+# Load environment variables (API keys, service URLs)
+load_dotenv()
+
+# Transcription backend: "deepgram" (remote API) or "vosk" (offline, local process pool)
+TRANSCRIPTION_BACKEND = os.getenv("TRANSCRIPTION_BACKEND", "deepgram")
+
+# Deepgram API Key (Load from Environment Variable). A missing key is reported by /ready
+DEEPGRAM_API_KEY = os.getenv("DEEPGRAM_API_KEY")
+
+# Vosk settings: model directory, decoder processes (each loads the model once) and frames fed per call
+VOSK_MODEL_PATH = os.getenv("VOSK_MODEL_PATH", "models/vosk-model-small-en-us-0.15")
+VOSK_WORKERS = int(os.getenv("VOSK_WORKERS", str(os.cpu_count() or 1)))
+VOSK_FRAMES_PER_READ = int(os.getenv("VOSK_FRAMES_PER_READ", "4000"))
+
+# Long recordings: WAV audio of at least TRANSCRIPTION_CHUNK_MIN_SECONDS is split at silences into
+# ~TARGET-second segments (never longer than MAX) that are transcribed concurrently
+TRANSCRIPTION_CHUNK_MIN_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_MIN_SECONDS", "120"))
+TRANSCRIPTION_CHUNK_TARGET_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_TARGET_SECONDS", "30"))
+TRANSCRIPTION_CHUNK_MAX_SECONDS = float(os.getenv("TRANSCRIPTION_CHUNK_MAX_SECONDS", "60"))
+TRANSCRIPTION_CHUNK_CONCURRENCY = int(os.getenv("TRANSCRIPTION_CHUNK_CONCURRENCY", "8"))
+
+# Normalize WAV uploads before transcription: downmix to mono, resample to 16 kHz, trim silence at both ends
+AUDIO_NORMALIZE = os.getenv("AUDIO_NORMALIZE", "1") == "1"
+
+# Voice-to-budget: transcribe uploads through the backend's live streaming API, so the budget
+# extraction can start on final segments while the rest of the recording is still being decoded
+AUDIO_BUDGET_STREAMING = os.getenv("AUDIO_BUDGET_STREAMING", "1") == "1"
+
+# Transcription result cache, keyed by a hash of the uploaded audio: "memory" (per-process LRU),
+# "sqlite" (shared across workers), "tiered" (LRU spilling to SQLite) or "none"
+TRANSCRIPTION_CACHE_BACKEND = os.getenv("TRANSCRIPTION_CACHE_BACKEND", "memory")
+TRANSCRIPTION_CACHE_MAX_ENTRIES = int(os.getenv("TRANSCRIPTION_CACHE_MAX_ENTRIES", "512"))
+TRANSCRIPTION_CACHE_TTL_SECONDS = float(os.getenv("TRANSCRIPTION_CACHE_TTL_SECONDS", "86400"))
+TRANSCRIPTION_CACHE_PATH = os.getenv("TRANSCRIPTION_CACHE_PATH", "cache/transcription_cache.sqlite3")
+
+# Size of the chunks in which spooled uploads are streamed to the backend
+TRANSCRIPTION_UPLOAD_CHUNK_BYTES = int(os.getenv("TRANSCRIPTION_UPLOAD_CHUNK_BYTES", str(64 * 1024)))
+
+# Deepgram connection settings (override the base URL to point tests/benchmarks at a local stub)
+DEEPGRAM_BASE_URL = os.getenv("DEEPGRAM_BASE_URL", "https://api.deepgram.com")
+DEEPGRAM_CONNECT_TIMEOUT = float(os.getenv("DEEPGRAM_CONNECT_TIMEOUT", "5"))
+DEEPGRAM_READ_TIMEOUT = float(os.getenv("DEEPGRAM_READ_TIMEOUT", "60"))
+DEEPGRAM_MAX_CONNECTIONS = int(os.getenv("DEEPGRAM_MAX_CONNECTIONS", "20"))
+DEEPGRAM_MAX_KEEPALIVE = int(os.getenv("DEEPGRAM_MAX_KEEPALIVE", "10"))
+DEEPGRAM_KEEPALIVE_EXPIRY = float(os.getenv("DEEPGRAM_KEEPALIVE_EXPIRY", "30"))
+
+
+async def _iter_file(file):
+    """Streams a binary file in chunks, reading in a worker thread (spooled uploads may be on disk)."""
+    file.seek(0)
+    while True:
+        chunk = await asyncio.to_thread(file.read, TRANSCRIPTION_UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _file_size(file):
+    file.seek(0, os.SEEK_END)
+    return file.tell()
+
+
+class TranscriptionError(Exception):
+    """Raised when the transcription service rejects a request."""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class DeepgramTranscriber:
+    """Transcribes audio through Deepgram using one pooled, keep-alive HTTP client per app."""
+
+    streams_containers = True  # open_stream() without an encoding decodes WebM/Opus, Ogg, MP3, ...
+
+    def __init__(self, api_key=DEEPGRAM_API_KEY, base_url=DEEPGRAM_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.client = None
+
+    def config_error(self):
+        """Describes what prevents this backend from working, or None if it is configured."""
+        if not self.api_key:
+            return "Deepgram API Key is missing! Set DEEPGRAM_API_KEY in your environment variables."
+        return None
+
+    async def start(self):
+        """Opens the shared HTTP client. Called once from the app lifespan."""
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            headers={"Authorization": f"Token {self.api_key}"},
+            timeout=httpx.Timeout(DEEPGRAM_READ_TIMEOUT, connect=DEEPGRAM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=DEEPGRAM_MAX_CONNECTIONS,
+                max_keepalive_connections=DEEPGRAM_MAX_KEEPALIVE,
+                keepalive_expiry=DEEPGRAM_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    async def aclose(self):
+        """Closes pooled connections. Called from the app lifespan on shutdown."""
+        if self.client is not None:
+            await self.client.aclose()
+            self.client = None
+
+    async def warmup(self):
+        """
+        Opens a pooled connection before the first request and checks the API key with a
+        cheap authenticated call. Raises TranscriptionError if Deepgram is unreachable or rejects the key.
+        """
+        try:
+            response = await self.client.get("/v1/projects")
+        except httpx.HTTPError as e:
+            raise TranscriptionError(502, f"Deepgram Error: {e!r}")
+        if response.status_code in (401, 403):
+            raise TranscriptionError(response.status_code, "Deepgram Error: the API key was rejected")
+
+    async def transcribe(self, audio, content_type):
+        """
+        Sends audio to Deepgram and returns the transcribed text. audio is bytes or a binary
+        file object (e.g. a spooled upload), which is streamed as the request body.
+        """
+        if not self.api_key:
+            raise TranscriptionError(503, self.config_error())
+        headers = {"Content-Type": content_type}  # Automatically detects file type
+        if isinstance(audio, bytes):
+            content = audio
+        else:
+            headers["Content-Length"] = str(_file_size(audio))
+            content = _iter_file(audio)
+        try:
+            response = await self.client.post("/v1/listen", headers=headers, content=content)
+        except httpx.TimeoutException:
+            raise TranscriptionError(504, "Deepgram Error: request timed out")
+        except httpx.HTTPError as e:
+            raise TranscriptionError(502, f"Deepgram Error: {e}")
+
+        # Check for errors
+        if response.status_code != 200:
+            try:
+                detail = response.json()
+            except ValueError:
+                detail = response.text
+            raise TranscriptionError(response.status_code, f"Deepgram Error: {detail}")
+
+        # Extract Transcription
+        transcript_data = response.json()
+        return transcript_data.get("results", {}).get("channels", [{}])[0].get("alternatives", [{}])[0].get("transcript", "")
+
+    async def open_stream(self, encoding=None, sample_rate=16000):
+        """
+        Opens a live transcription session over Deepgram's streaming API. Without an encoding
+        the audio must be in a container (e.g. WebM/Opus from MediaRecorder); with
+        encoding="linear16" it is raw 16-bit mono PCM at sample_rate.
+        """
+        if not self.api_key:
+            raise TranscriptionError(503, self.config_error())
+        params = {"interim_results": "true"}
+        if encoding:
+            params.update(encoding=encoding, sample_rate=sample_rate, channels=1)
+        url = self.base_url.replace("https://", "wss://", 1).replace("http://", "ws://", 1)
+        stream = _DeepgramStream(f"{url}/v1/listen?{urlencode(params)}", self.api_key)
+        await stream.open()
+        return stream
+
+
+class _TranscriptStream:
+    """
+    A live transcription session: audio goes in with send() and end(), ("partial" | "final", text)
+    events come out of events() as the backend produces them.
+    """
+
+    def __init__(self):
+        self._events = asyncio.Queue()
+
+    async def events(self):
+        while True:
+            event = await self._events.get()
+            if event is None:
+                return
+            if isinstance(event, TranscriptionError):
+                raise event
+            yield event
+
+
+class _DeepgramStream(_TranscriptStream):
+
+    def __init__(self, url, api_key):
+        super().__init__()
+        self.url = url
+        self.api_key = api_key
+        self.connection = None
+        self._reader = None
+
+    async def open(self):
+        from websockets.asyncio.client import connect
+
+        try:
+            self.connection = await connect(
+                self.url,
+                additional_headers={"Authorization": f"Token {self.api_key}"},
+                open_timeout=DEEPGRAM_CONNECT_TIMEOUT,
+            )
+        except Exception as e:  # Handshake rejected (bad key), DNS/TLS failure, timeout
+            raise TranscriptionError(502, f"Deepgram Error: {e}")
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        try:
+            async for message in self.connection:
+                result = json.loads(message)
+                if result.get("type") != "Results":
+                    continue
+                text = result["channel"]["alternatives"][0]["transcript"]
+                if text:
+                    await self._events.put(("final" if result.get("is_final") else "partial", text))
+        except Exception as e:
+            await self._events.put(TranscriptionError(502, f"Deepgram Error: {e}"))
+        finally:
+            await self._events.put(None)
+
+    async def _send(self, message):
+        try:
+            await self.connection.send(message)
+        except Exception as e:  # Connection closed by Deepgram (error, idle timeout)
+            raise TranscriptionError(502, f"Deepgram Error: {e}")
+
+    async def send(self, chunk):
+        await self._send(chunk)
+
+    async def end(self):
+        """No more audio: Deepgram flushes the last results, then closes the stream."""
+        await self._send(json.dumps({"type": "CloseStream"}))
+
+    async def aclose(self):
+        if self.connection is not None:
+            await self.connection.close()
+        if self._reader is not None:
+            await asyncio.gather(self._reader, return_exceptions=True)
+
+
+# =========================== Offline Vosk Backend =========================== #
+
+# Loaded once per decoder process by _load_vosk_model (the pool initializer)
+_vosk_model = None
+
+
+def _load_vosk_model(model_path):
+    global _vosk_model
+    from vosk import Model, SetLogLevel
+
+    SetLogLevel(-1)  # Kaldi logs every model load and decode to stderr
+    _vosk_model = Model(model_path)
+
+
+def _vosk_ready():
+    return _vosk_model is not None
+
+
+def _vosk_decode(source):
+    """Decodes 16-bit mono PCM WAV (bytes or a file path) with the process's Vosk model. Runs in a decoder process."""
+    from vosk import KaldiRecognizer
+
+    with wave.open(io.BytesIO(source) if isinstance(source, bytes) else source) as wav:
+        if wav.getnchannels() != 1 or wav.getsampwidth() != 2 or wav.getcomptype() != "NONE":
+            raise ValueError("expected 16-bit mono PCM WAV audio")
+
+        recognizer = KaldiRecognizer(_vosk_model, wav.getframerate())
+        parts = []
+        while True:
+            data = wav.readframes(VOSK_FRAMES_PER_READ)
+            if not data:
+                break
+            if recognizer.AcceptWaveform(data):
+                parts.append(json.loads(recognizer.Result())["text"])
+        parts.append(json.loads(recognizer.FinalResult())["text"])
+
+    return " ".join(part for part in parts if part)
+
+
+def _spill_to_disk(file):
+    """Copies a binary file object to a named temporary file (in chunks) and returns its path."""
+    file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as f:
+        shutil.copyfileobj(file, f, TRANSCRIPTION_UPLOAD_CHUNK_BYTES)
+    return f.name
+
+
+class VoskTranscriber:
+    """
+    Transcribes WAV audio offline with Vosk. Decoding is CPU-bound, so it runs in a pool of
+    worker processes that each load the model once, and the event loop only awaits the result.
+    """
+
+    streams_containers = False  # Live sessions take raw PCM only
+
+    def __init__(self, model_path=VOSK_MODEL_PATH, workers=VOSK_WORKERS):
+        self.model_path = model_path
+        self.workers = workers
+        self.executor = None
+        self._stream_model = None  # Loaded in this process on the first live session
+        self._stream_model_lock = threading.Lock()
+
+    def config_error(self):
+        """Describes what prevents this backend from working, or None if it is configured."""
+        if importlib.util.find_spec("vosk") is None:
+            return "Vosk backend requires the vosk package."
+        if not os.path.isdir(self.model_path):
+            return f"Vosk model not found at {self.model_path}. Set VOSK_MODEL_PATH."
+        return None
+
+    async def start(self):
+        """Creates the decoder pool. Called once from the app lifespan; processes start on first use."""
+        if self.config_error() is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),  # Don't fork a process running an event loop and threads
+                initializer=_load_vosk_model,
+                initargs=(self.model_path,),
+            )
+
+    async def aclose(self):
+        """Stops the decoder processes. Called from the app lifespan on shutdown."""
+        if self.executor is not None:
+            await asyncio.to_thread(self.executor.shutdown, wait=True, cancel_futures=True)
+            self.executor = None
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        except BrokenProcessPool:
+            raise TranscriptionError(503, "Vosk Error: a decoder process died (model failed to load?)")
+
+    async def warmup(self):
+        """Starts every decoder process and loads its model, so the first request does not pay for it."""
+        if self.executor is None:
+            raise TranscriptionError(503, self.config_error())
+        await asyncio.gather(*(self._run(_vosk_ready) for _ in range(self.workers)))
+
+    async def transcribe(self, audio, content_type):
+        """
+        Decodes a WAV upload in the process pool and returns the transcribed text. audio is
+        bytes or a binary file object; files are handed to the decoder as a temporary file
+        path, so the audio is never held in memory by this process.
+        """
+        if self.executor is None:
+            raise TranscriptionError(503, self.config_error())
+        path = None if isinstance(audio, bytes) else await asyncio.to_thread(_spill_to_disk, audio)
+        try:
+            return await self._run(_vosk_decode, audio if path is None else path)
+        except (wave.Error, EOFError, ValueError) as e:
+            raise TranscriptionError(415, f"Vosk Error: unsupported audio ({e}); send 16-bit mono PCM WAV")
+        finally:
+            if path is not None:
+                os.remove(path)
+
+
+    def _load_stream_model(self):
+        with self._stream_model_lock:
+            if self._stream_model is None:
+                from vosk import Model, SetLogLevel
+
+                SetLogLevel(-1)
+                self._stream_model = Model(self.model_path)
+            return self._stream_model
+
+    async def open_stream(self, encoding=None, sample_rate=16000):
+        """
+        Opens a live transcription session on raw 16-bit mono PCM. A session feeds one
+        recognizer chunk by chunk, so it runs in this process (in threads, vosk releases the
+        GIL while decoding) rather than in the pool, where consecutive chunks could land in
+        different processes.
+        """
+        config_error = self.config_error()
+        if config_error is not None:
+            raise TranscriptionError(503, config_error)
+        if encoding not in (None, "linear16"):
+            raise TranscriptionError(415, "Vosk Error: live audio must be linear16 (16-bit mono PCM)")
+        model = await asyncio.to_thread(self._load_stream_model)
+        return _VoskStream(model, sample_rate)
+
+
+class _VoskStream(_TranscriptStream):
+
+    def __init__(self, model, sample_rate):
+        from vosk import KaldiRecognizer
+
+        super().__init__()
+        self.recognizer = KaldiRecognizer(model, sample_rate)
+        self._partial = ""
+
+    def _accept(self, chunk):
+        if self.recognizer.AcceptWaveform(chunk):
+            return "final", json.loads(self.recognizer.Result())["text"]
+        return "partial", json.loads(self.recognizer.PartialResult())["partial"]
+
+    async def send(self, chunk):
+        kind, text = await asyncio.to_thread(self._accept, chunk)
+        if kind == "partial" and text == self._partial:
+            return  # Nothing new was recognized in this chunk
+        self._partial = "" if kind == "final" else text
+        if text:
+            await self._events.put((kind, text))
+
+    async def end(self):
+        text = json.loads(await asyncio.to_thread(self.recognizer.FinalResult))["text"]
+        if text:
+            await self._events.put(("final", text))
+        await self._events.put(None)
+
+    async def aclose(self):
+        pass
+
+
+def create_transcriber(backend=TRANSCRIPTION_BACKEND):
+    """Builds the transcription backend selected by configuration ("deepgram" or "vosk")."""
+    if backend == "deepgram":
+        return DeepgramTranscriber()
+    if backend == "vosk":
+        return VoskTranscriber()
+    raise ValueError(f"Unknown transcription backend: {backend}")
+
+
+# =========================== Transcription Cache =========================== #
+
+# Re-uploads of the same clip (e.g. after the budget step failed) are answered without calling the backend
+transcription_cache = create_cache(
+    TRANSCRIPTION_CACHE_BACKEND,
+    max_entries=TRANSCRIPTION_CACHE_MAX_ENTRIES,
+    ttl_seconds=TRANSCRIPTION_CACHE_TTL_SECONDS,
+    path=TRANSCRIPTION_CACHE_PATH,
+)
+
+
+def transcription_cache_key(audio_sha256, normalize, mode):
+    """Cache key: backend + hash of the uploaded audio + the options that change the result."""
+    return make_cache_key(TRANSCRIPTION_BACKEND, audio_sha256, normalize, mode)
+
+
+# =========================== Chunked Transcription =========================== #
+
+def _plan_segments(audio, min_seconds):
+    """Returns (mono samples, rate, [(start, end) sample ranges]), or None to transcribe in one shot."""
+    from audio_processing import read_wav, speech_segments, to_mono
+
+    try:
+        samples, rate = read_wav(audio)
+    except (wave.Error, EOFError, ValueError):
+        return None  # Not PCM WAV (e.g. WebM): only the backend can decode it
+    if len(samples) < min_seconds * rate:
+        return None
+
+    mono = to_mono(samples)
+    ranges = speech_segments(mono, rate, TRANSCRIPTION_CHUNK_TARGET_SECONDS, TRANSCRIPTION_CHUNK_MAX_SECONDS)
+    return mono, rate, ranges
+
+
+async def transcribe_recording(
+    transcriber, audio, content_type, min_seconds=TRANSCRIPTION_CHUNK_MIN_SECONDS, start_offset=0.0
+):
+    """
+    Transcribes a recording with the given backend. WAV recordings of at least min_seconds are
+    split at silences and the segments are transcribed concurrently (in parallel Vosk processes,
+    or as parallel Deepgram requests), then stitched back in order. audio is bytes or a
+    binary file object (memory-mapped for the split rather than read into RAM). start_offset
+    (seconds) is added to the segment timestamps, e.g. the silence trimmed by normalize_audio.
+
+    Returns (text, segments): segments lists {"start", "end", "text"} (seconds) for chunked
+    recordings, and is None when the recording was transcribed in one shot.
+    """
+    plan = await asyncio.to_thread(_plan_segments, audio, min_seconds)
+    if plan is None:
+        return await transcriber.transcribe(audio, content_type), None
+
+    from audio_processing import write_wav
+
+    mono, rate, ranges = plan
+    semaphore = asyncio.Semaphore(TRANSCRIPTION_CHUNK_CONCURRENCY)
+
+    async def transcribe_segment(start, end):
+        async with semaphore:  # Also bounds how many segment WAVs exist at once
+            segment = await asyncio.to_thread(write_wav, mono[start:end], rate)
+            return await transcriber.transcribe(segment, "audio/wav")
+
+    texts = await asyncio.gather(*(transcribe_segment(start, end) for start, end in ranges))
+    segments = [
+        {"start": round(start_offset + start / rate, 2), "end": round(start_offset + end / rate, 2), "text": text}
+        for (start, end), text in zip(ranges, texts)
+    ]
+    return " ".join(segment["text"] for segment in segments if segment["text"]), segments
+
+
+# =========================== Audio Normalization =========================== #
+
+def _normalize(audio):
+    from audio_processing import normalize_wav
+    from uploads import UPLOAD_SPOOL_BYTES
+
+    output = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES)
+    try:
+        trimmed = normalize_wav(audio, output)
+    except (wave.Error, EOFError, ValueError):
+        output.close()
+        return None
+    output.seek(0)
+    return output, trimmed
+
+
+async def normalize_audio(audio):
+    """
+    Converts a PCM WAV recording (bytes or a binary file) to 16 kHz mono with the silence at both
+    ends trimmed, which shrinks browser recordings (typically 48 kHz stereo) several times before
+    they are uploaded to Deepgram or decoded by Vosk. Returns (spooled WAV file, seconds trimmed
+    from the start), or None when the audio is not PCM WAV and must be sent as is.
+    """
+    return await asyncio.to_thread(_normalize, audio)
+
+
+# =========================== Streamed Recording Transcription =========================== #
+
+async def _pcm_chunks(samples):
+    """Mono 16-bit PCM chunks of (frames, channels) samples, TRANSCRIPTION_UPLOAD_CHUNK_BYTES each."""
+    from audio_processing import to_mono
+
+    frames = TRANSCRIPTION_UPLOAD_CHUNK_BYTES // 2
+    for start in range(0, len(samples), frames):
+        yield to_mono(samples[start:start + frames]).astype("<i2").tobytes()
+
+
+async def _container_chunks(audio):
+    if isinstance(audio, bytes):
+        for start in range(0, len(audio), TRANSCRIPTION_UPLOAD_CHUNK_BYTES):
+            yield audio[start:start + TRANSCRIPTION_UPLOAD_CHUNK_BYTES]
+    else:
+        async for chunk in _iter_file(audio):
+            yield chunk
+
+
+def _read_pcm(audio):
+    from audio_processing import read_wav
+
+    try:
+        return read_wav(audio)
+    except (wave.Error, EOFError, ValueError):
+        return None  # Not PCM WAV: sent as a container stream
+
+
+async def stream_recording(transcriber, audio):
+    """
+    Transcribes a recorded upload (bytes or a binary file) through the backend's live
+    streaming API and yields the text of each final segment as soon as it is recognized,
+    while the rest of the recording is still being sent and decoded. PCM WAV is sent as
+    linear16 mono; other formats as their container stream (Deepgram only).
+    Raises TranscriptionError if the session cannot be opened or fails midway, and 415 if
+    the upload is not PCM WAV and the backend cannot decode containers.
+    """
+    pcm = await asyncio.to_thread(_read_pcm, audio)
+    if pcm is None:
+        if not transcriber.streams_containers:
+            raise TranscriptionError(415, "Unsupported audio: this backend can only stream 16-bit PCM WAV uploads")
+        stream = await transcriber.open_stream()
+        chunks = _container_chunks(audio)
+    else:
+        samples, rate = pcm
+        stream = await transcriber.open_stream(encoding="linear16", sample_rate=rate)
+        chunks = _pcm_chunks(samples)
+
+    async def send_audio():
+        try:
+            async for chunk in chunks:
+                await stream.send(chunk)
+        finally:
+            await stream.end()
+
+    sender = asyncio.create_task(send_audio())
+    try:
+        async for kind, text in stream.events():
+            if kind == "final":
+                yield text
+        await sender  # Surfaces a failed send
+    finally:
+        sender.cancel()
+        await stream.aclose()
@@ -0,0 +1,92 @@
+import hashlib
+import os
+from tempfile import SpooledTemporaryFile
+from starlette.datastructures import Headers, UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+# Largest accepted audio upload; bigger uploads are rejected with 413 as soon as the limit is crossed
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+# Uploads are kept in memory up to this size, then spooled to a temporary file
+UPLOAD_SPOOL_BYTES = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+
+
+class UploadError(Exception):
+    """Raised when an upload is rejected. Carries the HTTP status to answer with."""
+
+    def __init__(self, status_code, detail):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _SpoolingMultiPartParser(MultiPartParser):
+    spool_max_size = UPLOAD_SPOOL_BYTES
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.digests = {}  # UploadFile -> sha256 of its content, updated as the parts stream in
+
+    def on_part_data(self, data, start, end):
+        super().on_part_data(data, start, end)
+        if self._current_part.file is not None:
+            self.digests.setdefault(self._current_part.file, hashlib.sha256()).update(data[start:end])
+
+
+async def _limited_stream(request, max_bytes):
+    """Yields the request body, failing as soon as more than max_bytes have been received."""
+    received = 0
+    async for chunk in request.stream():
+        received += len(chunk)
+        if received > max_bytes:
+            raise UploadError(413, f"Upload too large: the limit is {max_bytes} bytes.")
+        yield chunk
+
+
+async def receive_upload(request, field="file", max_bytes=MAX_UPLOAD_BYTES):
+    """
+    Receives an uploaded file without holding it in memory: the body is streamed into a
+    spooled temporary file (RAM up to UPLOAD_SPOOL_BYTES, then disk) and the size limit is
+    enforced while streaming. Accepts multipart form data (the file in `field`) or a raw
+    body such as audio/wav. Returns an UploadFile positioned at the start; close it when done.
+    Its `sha256` attribute is the hex digest of the file content, hashed while streaming.
+    """
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise UploadError(413, f"Upload too large: the limit is {max_bytes} bytes.")
+
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        parser = _SpoolingMultiPartParser(request.headers, _limited_stream(request, max_bytes), max_files=1, max_fields=10)
+        try:
+            form = await parser.parse()
+        except MultiPartException as e:
+            raise UploadError(400, e.message)
+        except UploadError:
+            # Raised by _limited_stream mid-parse: the parser only closes its spooled files on MultiPartException
+            for file in parser._files_to_close_on_error:
+                file.close()
+            raise
+        upload = form.get(field)
+        if not isinstance(upload, UploadFile):
+            await form.close()
+            raise UploadError(422, f"Missing file field: {field}")
+        digest = parser.digests.get(upload, hashlib.sha256())
+    else:
+        upload = UploadFile(
+            SpooledTemporaryFile(max_size=UPLOAD_SPOOL_BYTES),
+            size=0,
+            headers=Headers({"content-type": content_type or "application/octet-stream"}),
+        )
+        digest = hashlib.sha256()
+        try:
+            async for chunk in _limited_stream(request, max_bytes):
+                digest.update(chunk)
+                await upload.write(chunk)
+        except BaseException:
+            await upload.close()
+            raise
+
+    upload.sha256 = digest.hexdigest()
+    await upload.seek(0)
+    return upload